@@ -0,0 +1,169 @@
+import contextvars
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from metrics import registry
+
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))  # Longer expected waits are shed with 429
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "200"))  # Waiting calls per upstream
+
+# Lower runs first. Set per request with set_priority; threads started with a copied context inherit it.
+PRIORITIES = {"preview": 0, "generate": 1, "background": 2}
+_priority: contextvars.ContextVar = contextvars.ContextVar("admission_priority", default=PRIORITIES["generate"])
+
+QUEUE_DEPTH = registry.gauge("admission_queue_depth", "Upstream calls waiting for a rate-limit token.", ["upstream"])
+QUEUE_WAIT_SECONDS = registry.histogram("admission_wait_seconds", "Time calls waited for admission.", ["upstream", "priority"])
+SHED_TOTAL = registry.counter("admission_shed_total", "Calls rejected because the expected wait was too long.", ["upstream", "priority"])
+
+_PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+
+
+def set_priority(name: str) -> None:
+    """Sets the admission priority (a PRIORITIES key) for upstream calls made from the current context."""
+    _priority.set(PRIORITIES[name])
+
+
+class Overloaded(Exception):
+    """An upstream's queue is too long to wait in; retry after `retry_after` seconds."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = max(1, math.ceil(retry_after))
+        super().__init__(f"{upstream} is at capacity, retry in {self.retry_after}s")
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`. A rate of 0 or less means unlimited. Not thread-safe."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def seconds_until(self, tokens: float) -> float:
+        """Time until `tokens` tokens will have accumulated, ignoring the burst cap."""
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+
+class AdmissionController:
+    """
+    Rate limits calls to one upstream with a token bucket and a priority queue.
+
+    `acquire` takes a token, waiting if none is left. Waiting calls are served in
+    priority order (then arrival order), so preview calls overtake queued deck
+    builds. A call whose expected wait is over max_wait, or that finds max_queue
+    calls already waiting, is shed straight away with Overloaded instead of
+    queueing, as is one that still has no token after max_wait.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float, max_queue: int = ADMISSION_MAX_QUEUE,
+                 max_wait: float = ADMISSION_MAX_WAIT_SECONDS):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.admitted = 0
+        self.shed = 0
+        self._queue: List[Tuple[int, int]] = []  # heap of (priority, arrival)
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+
+    def _expected_wait(self, priority: int, cost: int) -> float:
+        ahead = sum(1 for queued_priority, _ in self._queue if queued_priority <= priority)
+        return self.bucket.seconds_until(ahead + cost)
+
+    def _shed(self, priority: int, retry_after: float) -> Overloaded:
+        self.shed += 1
+        SHED_TOTAL.inc(upstream=self.name, priority=_PRIORITY_NAMES.get(priority, priority))
+        return Overloaded(self.name, retry_after)
+
+    def check(self, cost: int = 1, priority: Optional[int] = None) -> None:
+        """
+        Raises Overloaded if `cost` more calls at this priority could not start within max_wait.
+        Only the first `burst` of them are counted: a batch bigger than the bucket still gets
+        going on an idle upstream, and its later calls wait their turn in acquire.
+        """
+        priority = _priority.get() if priority is None else priority
+        with self._cond:
+            if self.bucket.unlimited:
+                return
+            self.bucket.refill(time.monotonic())
+            expected = self._expected_wait(priority, min(cost, self.bucket.capacity))
+            if expected > self.max_wait:
+                raise self._shed(priority, expected)
+
+    def acquire(self, priority: Optional[int] = None) -> float:
+        """Blocks until the call may go ahead and returns how long it waited."""
+        priority = _priority.get() if priority is None else priority
+        start = time.monotonic()
+        with self._cond:
+            if self.bucket.unlimited:
+                self.admitted += 1
+                return 0.0
+            self.bucket.refill(start)
+            expected = self._expected_wait(priority, 1)
+            if len(self._queue) >= self.max_queue or expected > self.max_wait:
+                raise self._shed(priority, expected)
+
+            entry = (priority, next(self._arrivals))
+            heapq.heappush(self._queue, entry)
+            QUEUE_DEPTH.inc(upstream=self.name)
+            deadline = start + self.max_wait
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.bucket.refill(now)
+                    if self._queue[0] == entry and self.bucket.tokens >= 1:
+                        heapq.heappop(self._queue)
+                        self.bucket.tokens -= 1
+                        break
+                    if now >= deadline:
+                        self._queue.remove(entry)
+                        heapq.heapify(self._queue)
+                        raise self._shed(priority, self._expected_wait(priority, 1))
+                    timeout = self.bucket.seconds_until(1) if self._queue[0] == entry else deadline - now
+                    self._cond.wait(min(max(timeout, 0.001), deadline - now))
+            finally:
+                QUEUE_DEPTH.dec(upstream=self.name)
+                self._cond.notify_all()  # The next call in line may be able to go now
+            self.admitted += 1
+
+        waited = time.monotonic() - start
+        QUEUE_WAIT_SECONDS.observe(waited, upstream=self.name, priority=_PRIORITY_NAMES.get(priority, priority))
+        return waited
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "queued": len(self._queue),
+                "rate": self.bucket.rate,
+                "burst": self.bucket.capacity,
+            }
+
+
+class AdmittedModel:
+    """Wraps an outline model so each generate_content call first passes an admission controller."""
+
+    def __init__(self, model, controller: AdmissionController):
+        self.model = model
+        self.controller = controller
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self.controller.acquire()
+        return self.model.generate_content(prompt, stream=stream)
@@ -0,0 +1,125 @@
+"""
+Load test: a burst of preview and generate requests against a quota-limited model.
+
+Starts the app under uvicorn with the fake Gemini model (which fails calls
+above its per-second quota, like Gemini) and the stub image worker, then sends
+a burst of previews and full generations at once with cold caches. Runs once
+with admission control off and once with rate limits set below the quota:
+
+- off: calls over the quota fail and the requests return 500
+- on:  calls queue for a token (previews first); requests that would wait too
+       long are turned away early with 429 and a Retry-After header
+
+Prints status counts and latency per endpoint plus the admission queue
+metrics scraped from /metrics.
+
+Run from the backend directory:
+    python -m benchmarks.bench_admission --previews 40 --generates 10 --quota 5
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GEMINI_KEY", "benchmark")
+os.environ.setdefault("LLM_PRELOAD", "0")  # The fake model replaces the SDK
+
+import requests
+
+import main
+import services
+from admission import AdmissionController
+from benchmarks.bench_e2e import free_port, percentile, start_app
+from benchmarks.fake_gemini import FakeGeminiModel
+from benchmarks.stub_worker import StubWorker
+from image_cache import ImageCache
+from image_worker import ImageWorkerClient
+
+
+def configure(llm_rate: float, llm_burst: float, image_rate: float, max_wait: float) -> None:
+    main.llm_admission = AdmissionController("gemini", llm_rate, llm_burst, max_wait=max_wait)
+    services.image_admission = main.image_admission = AdmissionController("image_worker", image_rate, image_rate * 2, max_wait=max_wait)
+
+
+def admission_metrics(base_url: str) -> list:
+    lines = requests.get(f"{base_url}/metrics").text.splitlines()
+    return [line for line in lines if line.startswith(("admission_wait_seconds_sum", "admission_wait_seconds_count", "admission_shed_total"))]
+
+
+def run_burst(base_url: str, previews: int, generates: int, slides: int, run: str) -> dict:
+    def one_request(item):
+        endpoint, i = item
+        body = {"title": f"Admission {run} {endpoint} {i}", "author": "Bench", "num_slides": slides, "template_name": "modern_minimalist"}
+        start = time.perf_counter()
+        response = requests.post(f"{base_url}{endpoint}", json=body)
+        return endpoint, response.status_code, response.headers.get("Retry-After"), time.perf_counter() - start
+
+    work = [("/api/generate_presentation", i) for i in range(generates)] + [("/api/preview_slides", i) for i in range(previews)]
+    with ThreadPoolExecutor(max_workers=len(work)) as pool:
+        results = list(pool.map(one_request, work))
+
+    summary = {}
+    for endpoint in ("/api/preview_slides", "/api/generate_presentation"):
+        rows = [r for r in results if r[0] == endpoint]
+        ok = [latency for _, status, _, latency in rows if status == 200]
+        summary[endpoint] = {
+            "200": len(ok),
+            "429": sum(1 for _, status, _, _ in rows if status == 429),
+            "500": sum(1 for _, status, _, _ in rows if status >= 500),
+            "429_with_retry_after": sum(1 for _, status, retry, _ in rows if status == 429 and retry),
+            "p50_s": percentile(ok, 50),
+            "p95_s": percentile(ok, 95),
+        }
+    return summary
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--previews", type=int, default=40)
+    parser.add_argument("--generates", type=int, default=10)
+    parser.add_argument("--slides", type=int, default=6)
+    parser.add_argument("--quota", type=float, default=5, help="Fake model calls allowed per second")
+    parser.add_argument("--llm-rate", type=float, default=4, help="Admission rate for the model (below the quota)")
+    parser.add_argument("--image-rate", type=float, default=20, help="Admission rate for the image worker")
+    parser.add_argument("--max-wait", type=float, default=5, help="Longest expected wait before shedding, seconds")
+    parser.add_argument("--image-delay", type=float, default=0.2, help="Stub worker delay per image, seconds")
+    args = parser.parse_args()
+
+    with StubWorker(delay=args.image_delay) as worker, tempfile.TemporaryDirectory() as cache_dir, \
+            tempfile.TemporaryDirectory() as store_dir:
+        services.image_worker = main.image_worker = ImageWorkerClient(worker.url)
+        services.image_cache = main.image_cache = ImageCache(cache_dir=cache_dir)
+        services.derived_cache = main.derived_cache = ImageCache(cache_dir=os.path.join(cache_dir, "derived"))
+        main.deck_store = main.DeckStore(store_dir)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_app(port)
+        try:
+            # Any one-second window admits at most rate + burst calls, so keep that within the quota
+            llm_burst = max(1, args.quota - args.llm_rate)
+            for run, rates in (("off", (0, 0, 0)), ("on", (args.llm_rate, llm_burst, args.image_rate))):
+                model = FakeGeminiModel(first_token_delay=0.3, quota_per_second=args.quota)
+                main.get_model = lambda: model
+                configure(*rates, args.max_wait)
+                time.sleep(1.0)  # Let the quota window from the previous run expire
+
+                start = time.perf_counter()
+                summary = run_burst(base_url, args.previews, args.generates, args.slides, run)
+                elapsed = time.perf_counter() - start
+                print(f"admission {run}: {elapsed:5.1f}s, {model.calls} model calls, {model.quota_errors} over quota")
+                for endpoint, s in summary.items():
+                    print(f"  {endpoint:28s} 200: {s['200']:3d}  429: {s['429']:3d} ({s['429_with_retry_after']} with Retry-After)  "
+                          f"5xx: {s['500']:3d}  p50 {s['p50_s']:5.2f}s  p95 {s['p95_s']:5.2f}s")
+                if run == "on":
+                    assert all(s["500"] == 0 for s in summary.values()), "admission control should prevent upstream failures"
+                    assert all(s["429"] == s["429_with_retry_after"] for s in summary.values())
+            print("admission metrics:")
+            for line in admission_metrics(base_url):
+                print(f"  {line}")
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,101 @@
+"""
+Benchmark: chart slides with 10^5 to 10^6 points, raw vs. the downsampling chart stage.
+
+The baseline is the original add_chart_to_slide: every value as a Python list into
+one CategoryChartData series, drawn as a clustered bar with data labels. The new
+path goes through charts.prepare_chart with the default point budget, for a line
+(LTTB), a bucketed column chart and a two-series line from columnar input. Reports
+build + save time, the chart part's XML size and the saved deck size, and checks
+that LTTB kept every spike in the line.
+
+python-pptx writes chart XML by string concatenation, so the raw path is quadratic
+in the point count (20k points already take ~20s). The baseline therefore runs at
+--baseline-sizes and its time at the large sizes is extrapolated from the largest.
+
+Run from the backend directory:
+    python -m benchmarks.bench_charts --sizes 100000 300000 1000000 --baseline-sizes 5000 10000 20000
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+from pptx import Presentation
+from pptx.chart.data import CategoryChartData
+from pptx.enum.chart import XL_CHART_TYPE
+from pptx.util import Inches
+
+import services
+from charts import CHART_POINT_BUDGET, prepare_chart
+
+
+def raw_chart(slide, chart_data) -> None:
+    """add_chart_to_slide as it was before the chart stage."""
+    chart_data_obj = CategoryChartData()
+    chart_data_obj.categories = list(chart_data["categories"])
+    chart_data_obj.add_series('Series 1', list(chart_data["values"]))
+    chart = slide.shapes.add_chart(XL_CHART_TYPE.BAR_CLUSTERED, Inches(0.5), Inches(1.5), Inches(5), Inches(3), chart_data_obj).chart
+    chart.has_legend = True
+    chart.plots[0].has_data_labels = True
+
+
+def build(add) -> dict:
+    """Times one chart slide from creation to saved bytes."""
+    prs = Presentation()
+    start = time.perf_counter()
+    add(prs.slides.add_slide(prs.slide_layouts[5]))
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    elapsed = time.perf_counter() - start
+    chart_xml = next(part for part in Presentation(io.BytesIO(buffer.getvalue())).part.package.iter_parts()
+                     if part.partname.startswith("/ppt/charts/"))
+    return {"seconds": elapsed, "chart_xml": len(chart_xml.blob), "deck": len(buffer.getvalue())}
+
+
+def signal(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    y = np.sin(np.linspace(0, 20, n)) + rng.normal(0, 0.05, n).cumsum() / np.sqrt(n)
+    y[spikes(n, seed)] += rng.choice([-4, 4], 5)  # Spikes a good downsampler must keep
+    return y
+
+
+def spikes(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed + 1000).choice(n, 5, replace=False)
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--baseline-sizes", type=int, nargs="+", default=[5_000, 10_000, 20_000],
+                        help="Inputs to run through the raw path")
+    args = parser.parse_args()
+
+    print(f"point budget {CHART_POINT_BUDGET}")
+    print(f"  {'points':>9s}  {'chart':24s} {'seconds':>8s} {'chart xml':>11s} {'deck':>11s}")
+    for n in args.baseline_sizes:
+        x, y = np.arange(n), signal(n)
+        baseline = build(lambda slide: raw_chart(slide, {"categories": x.tolist(), "values": y.tolist()}))
+        print(f"  {n:9d}  {'raw bar (baseline)':24s} {baseline['seconds']:8.3f} {baseline['chart_xml']:11,d} {baseline['deck']:11,d}")
+    largest = max(args.baseline_sizes)
+
+    for n in args.sizes:
+        print(f"  {n:9d}  {'raw bar, extrapolated':24s} {baseline['seconds'] * (n / largest) ** 2:8.0f} "
+              f"{round(baseline['chart_xml'] * n / largest):11,d}")
+        x = np.arange(n)
+        y = signal(n)
+        cases = [
+            ("line (LTTB)", {"categories": x, "values": y, "type": "line"}),
+            ("column (bucket mean)", {"categories": x, "values": y, "type": "column"}),
+            ("2-series line, columnar", {"columns": {"t": x, "a": y, "b": signal(n, 1)}, "category_column": "t", "type": "line"}),
+        ]
+        for name, chart_data in cases:
+            result = build(lambda slide: services.add_chart_to_slide(slide, chart_data))
+            print(f"  {n:9d}  {name:24s} {result['seconds']:8.3f} {result['chart_xml']:11,d} {result['deck']:11,d}")
+
+        prepared = prepare_chart({"categories": x, "values": y, "type": "line"})
+        kept = set(prepared.data.categories[i].label for i in range(len(prepared.data.categories)))
+        assert kept.issuperset(spikes(n).tolist()), "LTTB should keep every spike"
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,97 @@
+"""
+Benchmark: a burst of identical generate requests with and without coalescing.
+
+Starts the app under uvicorn against the fake Gemini model and the stub image
+worker, then fires N copies of the same /api/generate_presentation request at
+once (a class all asking for the same topic). Reports model calls, image worker
+calls, wall time and the coalescing counters, once with request coalescing off
+and once with it on. A second burst gives every request its own author: the
+decks differ, but the outline and every slide image are still shared.
+
+Run from the backend directory:
+    python -m benchmarks.bench_coalescing --clients 20 --slides 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GEMINI_KEY", "benchmark")
+os.environ.setdefault("LLM_PRELOAD", "0")  # The fake model replaces the SDK
+os.environ.setdefault("LLM_RATE_PER_SECOND", "0")  # Measure the app, not the upstream rate limits
+os.environ.setdefault("IMAGE_RATE_PER_SECOND", "0")
+
+import requests
+
+import main
+import services
+from benchmarks.bench_e2e import free_port, start_app
+from benchmarks.fake_gemini import FakeGeminiModel
+from benchmarks.stub_worker import StubWorker
+from image_cache import ImageCache
+from image_worker import ImageWorkerClient
+from singleflight import SingleFlight
+
+
+def run_burst(base_url: str, worker: StubWorker, clients: int, slides: int, title: str, enabled: bool,
+              distinct_authors: bool) -> dict:
+    model = FakeGeminiModel(first_token_delay=0.3)
+    main.get_model = lambda: model
+    main.outline_flight = SingleFlight("outline", enabled)
+    main.deck_flight = SingleFlight("deck", enabled)
+    services.image_flight = main.image_flight = SingleFlight("image", enabled)
+    worker.calls = 0
+
+    def one_request(i):
+        author = f"Bench {i}" if distinct_authors else "Bench"
+        body = {"title": title, "author": author, "num_slides": slides, "template_name": "modern_minimalist"}
+        return requests.post(f"{base_url}/api/generate_presentation", json=body)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        responses = list(pool.map(one_request, range(clients)))
+    elapsed = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in responses), [r.status_code for r in responses]
+    if enabled and not distinct_authors:
+        assert len({r.content for r in responses}) == 1, "coalesced requests should get the same deck"
+    return {
+        "seconds": elapsed,
+        "model_calls": model.calls,
+        "worker_calls": worker.calls,
+        "coalesced": {name: stats["coalesced"] for name, stats in main.coalescing_stats().items()},
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="Identical requests sent at once")
+    parser.add_argument("--slides", type=int, default=8)
+    parser.add_argument("--image-delay", type=float, default=0.3, help="Stub worker delay per image, seconds")
+    args = parser.parse_args()
+
+    with StubWorker(delay=args.image_delay) as worker, tempfile.TemporaryDirectory() as cache_dir, \
+            tempfile.TemporaryDirectory() as store_dir:
+        services.image_worker = main.image_worker = ImageWorkerClient(worker.url)
+        services.image_cache = main.image_cache = ImageCache(cache_dir=cache_dir)
+        services.derived_cache = main.derived_cache = ImageCache(cache_dir=os.path.join(cache_dir, "derived"))
+        main.deck_store = main.DeckStore(store_dir)
+        port = free_port()
+        server = start_app(port)
+        try:
+            for distinct_authors in (False, True):
+                print("same request" if not distinct_authors else "same topic, one author per request")
+                for enabled in (False, True):
+                    # A new title per run keeps the outline and image caches cold
+                    title = f"Coalescing benchmark {distinct_authors} {enabled}"
+                    result = run_burst(f"http://127.0.0.1:{port}", worker, args.clients, args.slides, title, enabled, distinct_authors)
+                    print(f"  coalescing {'on ' if enabled else 'off'}  {args.clients} clients  {result['seconds']:6.2f}s  "
+                          f"model calls {result['model_calls']:3d}  worker calls {result['worker_calls']:4d}  "
+                          f"saved {result['coalesced']}")
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main_bench()
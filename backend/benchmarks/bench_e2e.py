@@ -0,0 +1,196 @@
+"""
+End-to-end benchmark: the FastAPI app against local stand-ins for Gemini and the image worker.
+
+Starts the app under uvicorn in this process, with the model replaced by
+FakeGeminiModel and the image worker by StubWorker, then drives
+/api/preview_slides and /api/generate_presentation at increasing concurrency.
+Each scenario reports throughput, p50/p95/p99 latency, peak RSS and deck size;
+results are written as JSON so runs can be compared across changes.
+
+Run from the backend directory:
+    python -m benchmarks.bench_e2e --concurrency 1 2 4 8 --requests 16 --output bench_e2e.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+os.environ.setdefault("GEMINI_KEY", "benchmark")
+os.environ.setdefault("LLM_PRELOAD", "0")  # The fake model replaces the SDK
+os.environ.setdefault("LLM_RATE_PER_SECOND", "0")  # Measure the app, not the upstream rate limits
+os.environ.setdefault("IMAGE_RATE_PER_SECOND", "0")
+
+import requests
+import uvicorn
+
+import main
+import services
+from benchmarks.fake_gemini import FakeGeminiModel
+from benchmarks.stub_worker import StubWorker
+from deck_store import DeckStore
+from image_cache import ImageCache
+from image_worker import ImageWorkerClient
+
+
+def current_rss_kib() -> int:
+    """Resident set size of this process, falling back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class RssSampler:
+    """Samples RSS in the background and keeps the peak seen while active."""
+
+    def __init__(self, interval: float = 0.02):
+        self.interval = interval
+        self.peak_kib = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_kib = max(self.peak_kib, current_rss_kib())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_kib = current_rss_kib()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def run_scenario(base_url: str, endpoint: str, concurrency: int, total: int, num_slides: int, titles) -> dict:
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=concurrency))
+
+    def one_request(_):
+        body = {"title": f"Benchmark topic {next(titles)}", "author": "Bench", "num_slides": num_slides, "template_name": "modern_minimalist"}
+        start = time.perf_counter()
+        response = session.post(f"{base_url}{endpoint}", json=body)
+        return time.perf_counter() - start, response.status_code, len(response.content)
+
+    with RssSampler() as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one_request, range(total)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, status, _ in results if status == 200]
+    sizes = [size for _, status, size in results if status == 200]
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": sum(1 for _, status, _ in results if status != 200),
+        "throughput_rps": round(len(latencies) / elapsed, 3),
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "peak_rss_mib": round(rss.peak_kib / 1024, 1),
+        "mean_response_bytes": round(sum(sizes) / len(sizes)) if sizes else 0,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--requests", type=int, default=16, help="Requests per scenario")
+    parser.add_argument("--slides", type=int, default=8)
+    parser.add_argument("--endpoints", nargs="+", default=["/api/preview_slides", "/api/generate_presentation"])
+    parser.add_argument("--llm-first-token", type=float, default=0.3, help="Fake model time-to-first-token, seconds")
+    parser.add_argument("--llm-cps", type=float, default=3000.0, help="Fake model characters per second")
+    parser.add_argument("--llm-bullets", type=int, default=4)
+    parser.add_argument("--image-delay", type=float, default=0.3, help="Stub worker delay per image, seconds")
+    parser.add_argument("--image-size", type=int, default=1024, help="Stub worker image edge, pixels")
+    parser.add_argument("--output", default="bench_e2e.json")
+    args = parser.parse_args()
+
+    model = FakeGeminiModel(first_token_delay=args.llm_first_token, chars_per_second=args.llm_cps, bullets=args.llm_bullets)
+    main.get_model = lambda: model
+    titles = count()  # Distinct titles keep outline and image caches cold; next() on count is thread-safe
+
+    scenarios = []
+    with StubWorker(delay=args.image_delay, image_size=(args.image_size, args.image_size)) as worker, \
+            tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as store_dir:
+        services.image_worker = ImageWorkerClient(worker.url)
+        services.image_cache = ImageCache(cache_dir=cache_dir)
+        services.derived_cache = ImageCache(cache_dir=os.path.join(cache_dir, "derived"))
+        main.image_cache, main.image_worker = services.image_cache, services.image_worker
+        main.derived_cache = services.derived_cache
+        main.deck_store = DeckStore(store_dir)  # Keep saved decks out of generated_decks/saved
+
+        port = free_port()
+        server = start_app(port)
+        try:
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    result = run_scenario(f"http://127.0.0.1:{port}", endpoint, concurrency, args.requests, args.slides, titles)
+                    scenarios.append(result)
+                    print(f"{endpoint:30s} c={concurrency:<3d} {result['throughput_rps']:7.2f} req/s  "
+                          f"p50 {result['p50_s']:6.2f}s  p95 {result['p95_s']:6.2f}s  p99 {result['p99_s']:6.2f}s  "
+                          f"rss {result['peak_rss_mib']:7.1f} MiB  {result['mean_response_bytes']:>9d} B  errors {result['errors']}")
+        finally:
+            server.should_exit = True
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": vars(args),
+        "scenarios": scenarios,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main_bench()
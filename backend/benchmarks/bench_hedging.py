@@ -0,0 +1,97 @@
+"""
+Benchmark: outline latency percentiles with and without hedged model calls.
+
+Calls main.get_ppt_content against local fake providers whose latency has a tail.
+Most calls take --delay seconds. A --slow-fraction of them stall for --slow-delay
+extra seconds, and a --garbage-fraction return text with no slides. The same
+request stream runs three times:
+
+- no hedging: one call per request (the original behaviour, plus the deadline)
+- hedged, same provider: a second call to the same model once the first is
+  slower than the LLM_HEDGE_PERCENTILE latency, or at once if it failed
+- hedged, backup provider: the second call goes to a separate fake model
+
+Prints p50/p95/p99/max latency, requests that ended as "Error" slides, and model
+calls per request (the cost of hedging). Checks that hedging cuts p99 and that no
+request fails when one attempt can still succeed.
+
+Run from the backend directory:
+    python -m benchmarks.bench_hedging --requests 400 --concurrency 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GEMINI_KEY", "benchmark")
+os.environ.setdefault("LLM_PRELOAD", "0")  # The fake model replaces the SDK
+os.environ.setdefault("LLM_RATE_PER_SECOND", "0")  # Measure hedging, not the upstream rate limit
+
+import main
+from benchmarks.bench_e2e import percentile
+from benchmarks.fake_gemini import FakeGeminiModel
+from hedging import HedgedCaller
+
+
+def run(args, max_attempts: int, backup: bool) -> dict:
+    fake = dict(first_token_delay=args.delay, chars_per_second=1e9, slow_fraction=args.slow_fraction,
+                slow_delay=args.slow_delay, garbage_fraction=args.garbage_fraction)
+    primary = FakeGeminiModel(seed=1, name="primary", **fake)
+    secondary = FakeGeminiModel(seed=2, name="backup", **fake) if backup else None
+    main.get_model = lambda: primary
+    main.get_backup_model = lambda: secondary
+    main.llm_hedge = HedgedCaller("llm", deadline=args.deadline, max_attempts=max_attempts,
+                                  hedge_percentile=args.percentile, hedge_after=args.delay * 3)
+
+    def one_request(i):
+        start = time.perf_counter()
+        slides = main.get_ppt_content(f"Hedging benchmark {i}", 5)
+        return time.perf_counter() - start, slides[0]["title"] == "Error"
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one_request, range(args.requests)))
+    latencies = [seconds for seconds, _ in results]
+    calls = primary.calls + (secondary.calls if secondary else 0)
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies),
+        "errors": sum(1 for _, failed in results if failed),
+        "calls_per_request": calls / args.requests,
+        "stats": main.llm_hedge.stats(),
+    }
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.1, help="Usual model latency, seconds")
+    parser.add_argument("--slow-fraction", type=float, default=0.04, help="Share of calls that stall")
+    parser.add_argument("--slow-delay", type=float, default=2.0, help="Extra seconds a stalled call takes")
+    parser.add_argument("--garbage-fraction", type=float, default=0.02, help="Share of calls with unparseable output")
+    parser.add_argument("--percentile", type=float, default=90, help="Hedge after this latency percentile")
+    parser.add_argument("--deadline", type=float, default=10, help="Per-request deadline, seconds")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requests, {args.concurrency} at a time; calls take {args.delay:.2f}s, "
+          f"{args.slow_fraction:.0%} stall +{args.slow_delay:.1f}s, {args.garbage_fraction:.0%} unparseable")
+    results = {}
+    for name, max_attempts, backup in (("no hedging", 1, False), ("hedged, same provider", 2, False),
+                                       ("hedged, backup provider", 2, True)):
+        results[name] = r = run(args, max_attempts, backup)
+        print(f"  {name:24s} p50 {r['p50']:5.2f}s  p95 {r['p95']:5.2f}s  p99 {r['p99']:5.2f}s  max {r['max']:5.2f}s  "
+              f"errors {r['errors']:3d}  calls/request {r['calls_per_request']:.2f}  "
+              f"(hedges {r['stats']['hedges']}, won {r['stats']['hedge_wins']}, hedge after {r['stats']['hedge_after_seconds']:.2f}s)")
+
+    baseline = results["no hedging"]
+    for name in ("hedged, same provider", "hedged, backup provider"):
+        assert results[name]["p99"] < baseline["p99"] / 2, f"{name} should at least halve p99"
+        assert results[name]["errors"] < baseline["errors"] or baseline["errors"] == 0
+    print(f"p99 reduction: {baseline['p99'] / results['hedged, same provider']['p99']:.1f}x (same provider), "
+          f"{baseline['p99'] / results['hedged, backup provider']['p99']:.1f}x (backup provider)")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,62 @@
+"""
+Benchmark: sequential vs. concurrent slide image fetching.
+
+Builds the same deck against a local stub worker with a fixed artificial delay,
+once with one image request at a time and once with the prefetch pool. With the
+pool the deck time should track the slowest image instead of the sum of all.
+
+Run from the backend directory:
+    python -m benchmarks.bench_image_prefetch --slides 15 --delay 0.5
+"""
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault("IMAGE_RATE_PER_SECOND", "0")  # Measure the prefetch pool, not the worker rate limit
+
+import services
+from image_cache import ImageCache
+from image_worker import ImageWorkerClient
+from benchmarks.stub_worker import StubWorker
+
+
+def build_deck(num_slides: int, concurrency: int, template_name: str) -> float:
+    request = SimpleNamespace(
+        title="Benchmark Deck", author="Bench", num_slides=num_slides, template_name=template_name
+    )
+    content = [{"title": f"Benchmark slide {i + 1}", "content": ["Point A", "Point B", "Point C"]} for i in range(num_slides)]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        services.image_cache = ImageCache(cache_dir=cache_dir)  # Cold cache so every image hits the worker
+        services.derived_cache = ImageCache(cache_dir=os.path.join(cache_dir, "derived"))
+        start = time.perf_counter()
+        services.generate_pptx_bytes(request, content, "realistic", template_name, image_concurrency=concurrency)
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=15)
+    parser.add_argument("--delay", type=float, default=0.5, help="Stub worker delay per image, in seconds")
+    parser.add_argument("--concurrency", type=int, default=services.IMAGE_CONCURRENCY)
+    parser.add_argument("--template", default="modern_minimalist")
+    args = parser.parse_args()
+
+    with StubWorker(delay=args.delay) as worker:
+        services.image_worker = ImageWorkerClient(worker.url)
+
+        sequential = build_deck(args.slides, 1, args.template)
+        concurrent = build_deck(args.slides, args.concurrency, args.template)
+
+    waves = -(-args.slides // args.concurrency)
+    print(f"slides={args.slides} delay={args.delay:.2f}s concurrency={args.concurrency}")
+    print(f"  sequential: {sequential:6.2f}s  (sum of delays  = {args.slides * args.delay:.2f}s)")
+    print(f"  concurrent: {concurrent:6.2f}s  (slowest x waves = {waves * args.delay:.2f}s)")
+    print(f"  speedup:    {sequential / concurrent:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark: image worker client under latency, failures and an outage.
+
+Scenarios against the local stub worker:
+  flaky  - some responses are 503s; compares a bare requests.post per image
+           with the pooled client that retries
+  outage - every response is a 503; compares time spent per deck with and
+           without the circuit breaker
+
+Run from the backend directory:
+    python -m benchmarks.bench_image_worker --images 30 --failure-rate 0.3
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.stub_worker import StubWorker
+from image_worker import CircuitBreaker, ImageWorkerClient
+
+
+def bare_post(url: str, prompt: str):
+    response = requests.post(url, json={"prompt": prompt, "style": "realistic"})
+    return response.content if response.status_code == 200 else None
+
+
+def run(fetch, images: int, concurrency: int):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, [f"prompt {i}" for i in range(images)]))
+    return time.perf_counter() - start, sum(1 for r in results if r)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--delay", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    print(f"flaky worker: {args.images} images, {args.failure_rate:.0%} injected 503s, delay {args.delay:.2f}s")
+    with StubWorker(delay=args.delay, failure_rate=args.failure_rate) as worker:
+        elapsed, ok = run(lambda p: bare_post(worker.url, p), args.images, args.concurrency)
+        print(f"  bare requests.post: {ok:3d}/{args.images} images in {elapsed:5.2f}s")
+        client = ImageWorkerClient(worker.url, backoff=0.05, breaker=CircuitBreaker(failure_threshold=1000))
+        elapsed, ok = run(lambda p: client.generate(p, "realistic"), args.images, args.concurrency)
+        print(f"  pooled + retries:   {ok:3d}/{args.images} images in {elapsed:5.2f}s  {client.stats()}")
+
+    print(f"worker outage: {args.images} images, every call fails")
+    with StubWorker(delay=args.delay, failure_rate=1.0) as worker:
+        client = ImageWorkerClient(worker.url, backoff=0.05, breaker=CircuitBreaker(failure_threshold=10**6))
+        elapsed, _ = run(lambda p: client.generate(p, "realistic"), args.images, args.concurrency)
+        print(f"  retries, no breaker: {elapsed:5.2f}s to fall back  ({client.stats()['calls']} worker calls)")
+        client = ImageWorkerClient(worker.url, backoff=0.05)
+        elapsed, _ = run(lambda p: client.generate(p, "realistic"), args.images, args.concurrency)
+        print(f"  with breaker:        {elapsed:5.2f}s to fall back  ({client.stats()['calls']} worker calls)")
+
+
+if __name__ == "__main__":
+    main()
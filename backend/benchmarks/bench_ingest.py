@@ -0,0 +1,79 @@
+"""
+Benchmark: large-document ingestion through the chunked map-reduce summarizer.
+
+Streams a synthetic markdown document in small byte pieces into
+`summarize_document` against a local fake Gemini model, and checks that the
+result has exactly the requested number of slides. Reports wall time, model
+calls and peak traced memory at each concurrency, next to the document size,
+so the memory ceiling and the concurrency speedup are both visible.
+
+Run from the backend directory:
+    python -m benchmarks.bench_ingest --megabytes 2 --slides 10 --concurrency 1 4 8
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from benchmarks.fake_gemini import FakeGeminiModel
+from ingest import chunk_size_for, iter_chunks, summarize_document
+
+SECTION = "## Section {n}\n\n" + ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 12 + "\n\n") * 4
+
+
+def document_size(total_bytes: int) -> int:
+    section = len(SECTION.format(n=0).encode("utf-8"))
+    return (total_bytes // section + 1) * section
+
+
+async def document_pieces(total_bytes: int, piece_size: int = 64 * 1024):
+    """Yields the document as bytes without ever building the whole thing."""
+    pending, sent, n = b"", 0, 0
+    while sent < total_bytes:
+        while len(pending) < piece_size:
+            pending += SECTION.format(n=n).encode("utf-8")
+            n += 1
+        piece, pending = pending[:min(piece_size, total_bytes - sent)], pending[piece_size:]
+        sent += len(piece)
+        yield piece
+        await asyncio.sleep(0)
+
+
+async def run(total_bytes: int, slides: int, concurrency: int, model: FakeGeminiModel) -> dict:
+    model.calls = 0
+    chunks = iter_chunks(document_pieces(total_bytes), chunk_size_for(total_bytes, slides))
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = await summarize_document(chunks, "Benchmark document", slides, model, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert len(result) == slides, f"expected {slides} slides, got {len(result)}"
+    assert all(slide["title"] and slide["content"] for slide in result)
+    return {"seconds": elapsed, "calls": model.calls, "peak_bytes": peak}
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=2.0, help="Document size")
+    parser.add_argument("--slides", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--first-token", type=float, default=0.05, help="Fake model time-to-first-token, seconds")
+    args = parser.parse_args()
+
+    total_bytes = document_size(int(args.megabytes * 1024 * 1024))
+    model = FakeGeminiModel(first_token_delay=args.first_token, chars_per_second=20000.0)
+    print(f"document {total_bytes / 1024 / 1024:.1f} MiB, chunks of {chunk_size_for(total_bytes, args.slides)} chars, {args.slides} slides")
+    for concurrency in args.concurrency:
+        result = asyncio.run(run(total_bytes, args.slides, concurrency, model))
+        print(f"concurrency {concurrency:<3d} {result['seconds']:7.2f}s  {result['calls']:4d} model calls  "
+              f"peak {result['peak_bytes'] / 1024 / 1024:6.2f} MiB traced")
+
+    # Small inputs: fewer sections than slides keeps one slide per section
+    short = asyncio.run(summarize_document(iter_chunks(document_pieces(100), 12000), "Short", 5, model))
+    assert len(short) == 1, short
+    print("✅ Exactly the requested number of slides for every run")
+
+
+if __name__ == "__main__":
+    main_bench()
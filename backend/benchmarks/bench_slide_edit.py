@@ -0,0 +1,111 @@
+"""
+Benchmark: editing one slide of a saved deck vs. regenerating the whole deck.
+
+Drives the API in-process against the fake Gemini model and the stub image
+worker. The baseline is what a one-slide change cost before decks were saved:
+a fresh generate_presentation with a changed outline, i.e. a new outline
+call, every image and the full build (also shown with warm caches, the best
+case for a rebuild). The edits go through /api/decks/{id}/slides/{n}: new text
+only, a new title (one new image) and a model rewrite of the bullets. Each
+result is checked by reopening the returned deck.
+
+Run from the backend directory:
+    python -m benchmarks.bench_slide_edit --slides 10 --image-delay 0.3 --rounds 3
+"""
+import argparse
+import io
+import os
+import statistics
+import tempfile
+import time
+from itertools import count
+
+os.environ.setdefault("GEMINI_KEY", "benchmark")
+os.environ.setdefault("LLM_PRELOAD", "0")  # The fake model replaces the SDK
+os.environ.setdefault("LLM_RATE_PER_SECOND", "0")  # Measure the app, not the upstream rate limits
+os.environ.setdefault("IMAGE_RATE_PER_SECOND", "0")
+
+from fastapi.testclient import TestClient
+from pptx import Presentation
+
+import main
+import services
+from benchmarks.fake_gemini import FakeGeminiModel
+from benchmarks.stub_worker import StubWorker
+from deck_store import DeckStore
+from image_cache import ImageCache
+from image_worker import ImageWorkerClient
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def slide_titles(pptx_bytes: bytes):
+    return [slide.shapes.title.text if slide.shapes.title else "" for slide in Presentation(io.BytesIO(pptx_bytes)).slides]
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--llm-first-token", type=float, default=0.3, help="Fake model time-to-first-token, seconds")
+    parser.add_argument("--image-delay", type=float, default=0.3, help="Stub worker delay per image, seconds")
+    parser.add_argument("--image-size", type=int, default=1024, help="Stub worker image edge, pixels")
+    args = parser.parse_args()
+
+    main.get_model = lambda: FakeGeminiModel(first_token_delay=args.llm_first_token)
+    topics = count()
+    timings = {name: [] for name in ("full, cold", "full, warm", "edit text", "edit title + image", "edit, model rewrite")}
+
+    with StubWorker(delay=args.image_delay, image_size=(args.image_size, args.image_size)) as worker, \
+            tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as store_dir:
+        services.image_worker = ImageWorkerClient(worker.url)
+        services.image_cache = ImageCache(cache_dir=cache_dir)
+        services.derived_cache = ImageCache(cache_dir=os.path.join(cache_dir, "derived"))
+        main.image_cache, main.image_worker = services.image_cache, services.image_worker
+        main.derived_cache = services.derived_cache
+        main.deck_store = DeckStore(store_dir)
+        client = TestClient(main.app)
+
+        for _ in range(args.rounds):
+            body = {"title": f"Edit benchmark {next(topics)}", "author": "Bench", "num_slides": args.slides,
+                    "template_name": "modern_minimalist"}
+            seconds, response = timed(lambda: client.post("/api/generate_presentation", json=body))
+            assert response.status_code == 200, response.text
+            timings["full, cold"].append(seconds)
+            seconds, response = timed(lambda: client.post("/api/generate_presentation", json=body))
+            timings["full, warm"].append(seconds)
+            deck_id = response.headers["X-Deck-Id"]
+
+            edit_url = f"/api/decks/{deck_id}/slides/1"
+            seconds, response = timed(lambda: client.post(edit_url, json={"content": ["Edited point A", "Edited point B"]}))
+            assert response.status_code == 200, response.text
+            timings["edit text"].append(seconds)
+
+            new_title = f"Retitled slide {next(topics)}"
+            seconds, response = timed(lambda: client.post(edit_url, json={"title": new_title}))
+            assert response.status_code == 200, response.text
+            assert new_title in slide_titles(response.content)
+            timings["edit title + image"].append(seconds)
+
+            seconds, response = timed(lambda: client.post(edit_url, json={"regenerate_text": True}))
+            assert response.status_code == 200, response.text
+            timings["edit, model rewrite"].append(seconds)
+
+            state = client.get(f"/api/decks/{deck_id}").json()
+            assert state["slides"][1]["title"] == new_title
+            assert len(slide_titles(response.content)) == len(slide_titles(client.get(f"/api/decks/{deck_id}/download").content))
+
+    cold = statistics.median(timings["full, cold"])
+    print(f"slides={args.slides} image delay={args.image_delay:.2f}s llm first token={args.llm_first_token:.2f}s "
+          f"rounds={args.rounds} (medians; 1/N of a cold build = {cold / args.slides:.3f}s)")
+    for name, values in timings.items():
+        median = statistics.median(values)
+        print(f"  {name:22s} {median:7.3f}s  {cold / median:6.1f}x faster than a cold rebuild")
+
+
+if __name__ == "__main__":
+    main_bench()
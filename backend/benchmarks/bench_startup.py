@@ -0,0 +1,79 @@
+"""
+Benchmark: cold-start cost of the API.
+
+Measures, in fresh interpreters:
+  import time        - `import main`
+  time-to-first-200  - from spawning uvicorn until GET /api/cache_stats answers 200
+
+Three setups are measured: google.generativeai imported up front, which is what
+every start paid before the SDK was loaded lazily; the default, a lazy import that
+lifespan starts preloading in a background thread (LLM_PRELOAD=1); and a lazy
+import with no preload (LLM_PRELOAD=0).
+
+Run from the backend directory:
+    python -m benchmarks.bench_startup --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+EAGER_IMPORT = "import google.generativeai; "
+
+
+def import_time(eager: bool, preload: bool) -> float:
+    code = f"import time; t = time.perf_counter(); {EAGER_IMPORT if eager else ''}import main; print(time.perf_counter() - t)"
+    output = subprocess.check_output([sys.executable, "-c", code], env=bench_env(preload), stderr=subprocess.DEVNULL, text=True)
+    return float(output.strip().splitlines()[-1])
+
+
+def time_to_first_200(eager: bool, preload: bool, timeout: float = 60.0) -> float:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    code = (f"{EAGER_IMPORT if eager else ''}import uvicorn; "
+            f"uvicorn.run('main:app', host='127.0.0.1', port={port}, log_level='warning')")
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", code], env=bench_env(preload), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                if requests.get(f"http://127.0.0.1:{port}/api/cache_stats", timeout=1).status_code == 200:
+                    return time.perf_counter() - start
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.005)
+        raise TimeoutError("server did not answer in time")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def bench_env(preload: bool) -> dict:
+    env = dict(os.environ)
+    env.setdefault("GEMINI_KEY", "benchmark")
+    env["LLM_PRELOAD"] = "1" if preload else "0"
+    return env
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for label, eager, preload in (("eager SDK import", True, False), ("lazy, preloaded (default)", False, True),
+                                  ("lazy, LLM_PRELOAD=0", False, False)):
+        imports = [import_time(eager, preload) for _ in range(args.runs)]
+        first_200 = [time_to_first_200(eager, preload) for _ in range(args.runs)]
+        print(f"{label:25s}: import main {statistics.median(imports) * 1000:7.0f} ms   "
+              f"time-to-first-200 {statistics.median(first_200) * 1000:7.0f} ms   (median of {args.runs})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: time-to-first-slide for the batch vs. streaming outline.
+
+Runs both paths against a local fake Gemini model. Also checks that the
+incremental parser returns exactly what the batch parser does when the same
+text arrives in arbitrary chunks.
+
+Run from the backend directory:
+    python -m benchmarks.bench_stream_outline --slides 10
+"""
+import argparse
+import random
+import time
+
+import main
+from benchmarks.fake_gemini import FakeGeminiModel
+from outline_parser import iter_outline, parse_outline
+
+
+def check_chunked_parsing(model: FakeGeminiModel, rounds: int = 200) -> None:
+    """Feeds the same outline in random chunk sizes and compares with the batch parser."""
+    samples = [
+        model.outline_text("Create a 7-slide PPT"),
+        "Slide 1\nIntro\n- a\ncontinued\n- b\n@\nSlide 2\n\nNo bullets\nloose line\n@\nSlide 3\n",
+        "  preamble\nSlide 1\nTitle\n- x\r\n- y\n@",
+    ]
+    rng = random.Random(0)
+    for text in samples:
+        expected = parse_outline(text)
+        for _ in range(rounds):
+            cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 30))))
+            chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+            assert list(iter_outline(chunks)) == expected, chunks
+    print(f"chunked parser matches batch parser on {len(samples) * rounds} random splits")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=10)
+    parser.add_argument("--first-token", type=float, default=0.3, help="Fake model time-to-first-token, seconds")
+    parser.add_argument("--cps", type=float, default=1500.0, help="Fake model characters per second")
+    args = parser.parse_args()
+
+    model = FakeGeminiModel(first_token_delay=args.first_token, chars_per_second=args.cps)
+    main.get_model = lambda: model
+    check_chunked_parsing(model)
+
+    start = time.perf_counter()
+    batch_slides = main.get_ppt_content("Benchmark", args.slides)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    first_slide = None
+    stream_slides = []
+    for slide in main.stream_ppt_content("Benchmark", args.slides):
+        if first_slide is None:
+            first_slide = time.perf_counter() - start
+        stream_slides.append(slide)
+    stream_time = time.perf_counter() - start
+
+    assert stream_slides == batch_slides
+    print(f"slides={args.slides} first_token={args.first_token:.2f}s cps={args.cps:.0f}")
+    print(f"  batch:     first slide {batch_time:6.2f}s  all slides {batch_time:6.2f}s")
+    print(f"  streaming: first slide {first_slide:6.2f}s  all slides {stream_time:6.2f}s")
+
+
+if __name__ == "__main__":
+    main_bench()
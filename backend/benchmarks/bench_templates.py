@@ -0,0 +1,57 @@
+"""
+Benchmark: per-request template load time and memory.
+
+Compares re-reading each shipped template from disk (`Presentation(path)`, the
+old behaviour) with opening a copy from the in-memory template registry.
+
+Run from the backend directory:
+    python -m benchmarks.bench_templates --rounds 50
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from pptx import Presentation
+
+import services
+from template_registry import TemplateRegistry
+
+
+def measure(load, rounds: int):
+    """Returns (mean ms per load, peak traced KiB for one load)."""
+    load()  # Warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        load()
+    mean_ms = (time.perf_counter() - start) / rounds * 1000
+
+    tracemalloc.start()
+    prs = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del prs
+    return mean_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    registry = TemplateRegistry(services.TEMPLATE_DIR)
+    registry.load_all()
+    print(f"registry startup: {(time.perf_counter() - start) * 1000:.1f} ms for {len(registry.names())} templates")
+
+    for name in registry.names():
+        path = os.path.join(services.TEMPLATE_DIR, f"{name}.pptx")
+        disk_ms, disk_kib = measure(lambda: Presentation(path), args.rounds)
+        mem_ms, mem_kib = measure(lambda: registry.open(name), args.rounds)
+        print(f"{name}")
+        print(f"  from disk:     {disk_ms:7.2f} ms/request  peak {disk_kib:8.0f} KiB")
+        print(f"  from registry: {mem_ms:7.2f} ms/request  peak {mem_kib:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: measurement-based text fitting vs. the old line-count loop.
+
+The old loop counted "\\n"-separated lines and rewrote every paragraph's font on
+each 2 pt step. The fitting engine wraps text with cached glyph widths and
+binary-searches the size once per slide, memoizing repeated text.
+
+Run from the backend directory:
+    python -m benchmarks.bench_text_fit --bullets 10 50 200 --rounds 20
+"""
+import argparse
+import random
+import time
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.util import Inches, Pt
+
+import services
+import text_fit
+
+WORDS = "market growth players teams revenue streaming audience sponsorship tournament league".split()
+
+
+def legacy_adjust_font_size(text_frame, max_lines=8, max_font_size=Pt(20), min_font_size=Pt(12)):
+    """The line-count loop that services.py used before the fitting engine."""
+    while text_frame.text and len(text_frame.text.split("\n")) > max_lines and max_font_size > min_font_size:
+        max_font_size -= Pt(2)
+        for paragraph in text_frame.paragraphs:
+            paragraph.font.size = max_font_size
+
+
+def new_text_frame(slide):
+    text_frame = slide.shapes.add_textbox(Inches(7.5), Inches(1.5), Inches(5.5), Inches(5)).text_frame
+    text_frame.word_wrap = True
+    text_frame.margin_bottom = Inches(0.2)
+    return text_frame
+
+
+def legacy(slide, bullets):
+    """Returns (seconds spent sizing, chosen size in pt)."""
+    text_frame = new_text_frame(slide)
+    for bullet in bullets:
+        p = text_frame.add_paragraph()
+        p.text = bullet
+        p.font.size = Pt(20)
+        p.font.color.rgb = RGBColor(0, 0, 0)
+    start = time.perf_counter()
+    legacy_adjust_font_size(text_frame)
+    return time.perf_counter() - start, text_frame.paragraphs[-1].font.size.pt
+
+
+def fitted(slide, bullets):
+    """Returns (seconds spent sizing, chosen size in pt)."""
+    text_frame = new_text_frame(slide)
+    start = time.perf_counter()
+    font_size = services.fit_text_size(text_frame, [""] + bullets, Inches(5.5), Inches(5))
+    elapsed = time.perf_counter() - start
+    for bullet in bullets:
+        p = text_frame.add_paragraph()
+        p.text = bullet
+        p.font.size = font_size
+        p.font.color.rgb = RGBColor(0, 0, 0)
+    return elapsed, font_size.pt
+
+
+def timed(fn, slide, bullet_sets):
+    """Mean milliseconds spent sizing one slide, and the sizes chosen."""
+    results = [fn(slide, bullets) for bullets in bullet_sets]
+    return sum(seconds for seconds, _ in results) / len(results) * 1000, [size for _, size in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bullets", type=int, nargs="+", default=[5, 20, 100, 400])
+    parser.add_argument("--rounds", type=int, default=20, help="Distinct bullet sets per size")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    slide = Presentation().slides.add_slide(Presentation().slide_layouts[6])
+    for count in args.bullets:
+        bullet_sets = [[" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 18))) for _ in range(count)]
+                       for _ in range(args.rounds)]
+        legacy_ms, legacy_sizes = timed(legacy, slide, bullet_sets)
+        text_fit._fit_font_size.cache_clear()
+        cold_ms, sizes = timed(fitted, slide, bullet_sets)
+        warm_ms, _ = timed(fitted, slide, bullet_sets)
+        print(f"{count:4d} bullets: legacy loop {legacy_ms:8.3f} ms/slide (size {legacy_sizes[0]:.0f}pt)   "
+              f"fit engine {cold_ms:8.3f} ms cold, {warm_ms:8.3f} ms memoized (size {sizes[0]:.0f}pt)")
+
+
+if __name__ == "__main__":
+    main()
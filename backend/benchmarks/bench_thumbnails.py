@@ -0,0 +1,111 @@
+"""
+Benchmark: preview thumbnail rendering, in-process vs. the process pool, cold vs. cached.
+
+Fills a fresh image cache with photo-sized JPEGs for the slide titles (as a
+previous build would have), then renders every slide's thumbnail three ways:
+in the calling thread, on the thumbnail process pool (first call includes the
+pool start-up, second is warm), and again once the thumbnails are cached.
+Finally fetches the thumbnails through the API to check the endpoints and
+cache headers. Target: under 100 ms per slide.
+
+Run from the backend directory:
+    python -m benchmarks.bench_thumbnails --slides 12 --workers 4
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+
+os.environ.setdefault("GEMINI_KEY", "benchmark")
+os.environ.setdefault("LLM_PRELOAD", "0")  # The fake model replaces the SDK
+os.environ.setdefault("LLM_RATE_PER_SECOND", "0")
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import main
+import services
+from benchmarks.fake_gemini import FakeGeminiModel
+from image_cache import ImageCache
+from thumbnails import ThumbnailPool
+
+MAX_MS_PER_SLIDE = 100
+
+
+def photo(size: int, seed: int) -> bytes:
+    """A noisy JPEG, so decoding costs what a real photo would."""
+    img = Image.effect_noise((size, size), 40 + seed % 30).convert("RGB")
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def deck_slides(count: int, run: str) -> list:
+    return [{"title": f"{run} slide {i + 1}",
+             "content": [f"Point {j + 1} of slide {i + 1}, with enough words to wrap in the text box" for j in range(4)]}
+            for i in range(count)]
+
+
+def timed_render(slides: list, template_name: str) -> float:
+    start = time.perf_counter()
+    keys = services.render_slide_thumbnails(slides, template_name)
+    elapsed = time.perf_counter() - start
+    assert len(keys) == len(slides) and all(services.thumbnail_path(key) for key in keys)
+    return elapsed
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--image-size", type=int, default=1024, help="Cached slide image edge, pixels")
+    parser.add_argument("--template", default="modern_minimalist")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        services.image_cache = main.image_cache = ImageCache(cache_dir=cache_dir)
+        services.derived_cache = main.derived_cache = ImageCache(cache_dir=os.path.join(cache_dir, "derived"))
+
+        runs = [("in-process, cold", 1), ("pool, cold start", args.workers), ("pool, warm", args.workers)]
+        slides_by_run = {}
+        for run, _ in runs:
+            slides_by_run[run] = deck_slides(args.slides, run)
+            for i, slide in enumerate(slides_by_run[run]):
+                if i % 4 != 3:  # Leave some slides without an image, like a deck with worker failures
+                    services.image_cache.put(slide["title"], "realistic", photo(args.image_size, i))
+
+        print(f"{args.slides} slides, {args.workers} workers, {args.image_size}px images, template {args.template}")
+        pool = services.thumbnail_pool
+        try:
+            for run, workers in runs:
+                if services.thumbnail_pool.workers != workers:
+                    services.thumbnail_pool = ThumbnailPool(workers)
+                elapsed = timed_render(slides_by_run[run], args.template)
+                per_slide = elapsed / args.slides * 1000
+                print(f"  {run:18s} {elapsed:6.3f}s  {per_slide:6.1f} ms/slide")
+                if run == "pool, warm":
+                    assert per_slide < MAX_MS_PER_SLIDE, f"{per_slide:.1f} ms per slide is over the {MAX_MS_PER_SLIDE} ms target"
+
+            elapsed = timed_render(slides_by_run["pool, warm"], args.template)
+            print(f"  {'cached':18s} {elapsed:6.3f}s  {elapsed / args.slides * 1000:6.1f} ms/slide")
+            images = services.image_cache.stats()
+            assert images["hits"] + images["misses"] == 0, "thumbnails should not count against the worker image cache"
+        finally:
+            services.thumbnail_pool.shutdown()
+            services.thumbnail_pool = pool
+
+        main.get_model = lambda: FakeGeminiModel(first_token_delay=0)
+        client = TestClient(main.app)
+        body = {"title": "Thumbnail benchmark", "author": "Bench", "num_slides": args.slides, "template_name": args.template}
+        response = client.post("/api/preview_slides/thumbnails", json=body)
+        assert response.status_code == 200, response.text
+        urls = response.json()["thumbnails"]
+        image = client.get(urls[0])
+        assert image.headers["content-type"] == "image/jpeg" and "immutable" in image.headers["cache-control"]
+        assert client.get("/api/thumbnails/" + "0" * 64).status_code == 404
+        print(f"  api: {len(urls)} thumbnails, first is {Image.open(io.BytesIO(image.content)).size} px")
+
+
+if __name__ == "__main__":
+    main_bench()
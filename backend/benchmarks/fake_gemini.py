@@ -0,0 +1,93 @@
+"""
+Local stand-in for `genai.GenerativeModel`, used by the benchmarks.
+
+Produces an outline in the same "Slide N / title / - bullet / @" format as
+Gemini, with a configurable time-to-first-token and generation speed.
+"""
+import random
+import re
+import threading
+import time
+from collections import deque
+
+
+class _Chunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """
+    Mimics `generate_content(prompt)` and `generate_content(prompt, stream=True)`.
+
+    first_token_delay: seconds before any text is produced
+    chars_per_second:  generation speed after the first token
+    chunk_size:        characters per streamed chunk
+    bullets, words:    bullets per slide and words per bullet (payload size)
+    quota_per_second:  calls allowed in any one-second window; more raise like a
+                       Gemini quota error (0 = no quota)
+    slow_fraction:     share of calls that stall for slow_delay extra seconds (tail latency)
+    garbage_fraction:  share of calls that return text with no parseable slides
+    """
+
+    def __init__(self, first_token_delay: float = 0.3, chars_per_second: float = 2000.0, chunk_size: int = 40,
+                 bullets: int = 4, words: int = 8, quota_per_second: float = 0, slow_fraction: float = 0,
+                 slow_delay: float = 5.0, garbage_fraction: float = 0, seed: int = 0, name: str = "fake"):
+        self.first_token_delay = first_token_delay
+        self.chars_per_second = chars_per_second
+        self.chunk_size = chunk_size
+        self.bullets = bullets
+        self.words = words
+        self.quota_per_second = quota_per_second
+        self.slow_fraction = slow_fraction
+        self.slow_delay = slow_delay
+        self.garbage_fraction = garbage_fraction
+        self.name = name
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.quota_errors = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+
+    def _check_quota(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            while self._recent and self._recent[0] <= now - 1.0:
+                self._recent.popleft()
+            if self.quota_per_second and len(self._recent) >= self.quota_per_second:
+                self.quota_errors += 1
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+            self._recent.append(now)
+
+    def outline_text(self, prompt: str) -> str:
+        match = re.search(r"Create a (\d+)-slide", prompt)
+        num_slides = int(match.group(1)) if match else 1 if "one slide" in prompt else 5
+        match = re.search(r'(?:blueprint for|presentation about) "(.*?)"', prompt)
+        topic = match.group(1) if match else "Generated"
+        parts = []
+        for n in range(1, num_slides + 1):
+            parts.append(f"Slide {n}")
+            parts.append(f"{topic} Title {n}")
+            for b in range(1, self.bullets + 1):
+                parts.append("- " + " ".join(f"word{n}_{b}_{w}" for w in range(self.words)))
+            parts.append("@")
+        return "\n".join(parts) + "\n"
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        self._check_quota()
+        with self._lock:
+            stall = self.slow_delay if self._random.random() < self.slow_fraction else 0.0
+            garbage = self._random.random() < self.garbage_fraction
+        text = "I'm sorry, I can't help with that.\n" if garbage else self.outline_text(prompt)
+        if stream:
+            return self._stream(text)
+        time.sleep(self.first_token_delay + stall + len(text) / self.chars_per_second)
+        return _Chunk(text)
+
+    def _stream(self, text: str):
+        time.sleep(self.first_token_delay)
+        for start in range(0, len(text), self.chunk_size):
+            chunk = text[start:start + self.chunk_size]
+            time.sleep(len(chunk) / self.chars_per_second)
+            yield _Chunk(chunk)
@@ -0,0 +1,93 @@
+"""
+Local stand-in for the Cloudflare image worker, used by the benchmarks.
+
+Answers every POST with a small PNG after an artificial delay, and can inject
+failures (503 responses) and hangs (responses slower than the client's timeout).
+"""
+import io
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+
+def make_png(size=(64, 64), color=(0, 51, 102)) -> bytes:
+    """Returns the bytes of a solid-colour PNG."""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class StubWorker:
+    """
+    Threaded HTTP server that mimics the image worker.
+
+    Usage:
+        with StubWorker(delay=0.5) as worker:
+            services.image_worker = ImageWorkerClient(worker.url)
+    """
+
+    def __init__(self, delay: float = 0.5, image_size=(64, 64), failure_rate: float = 0.0,
+                 hang_rate: float = 0.0, hang_seconds: float = 5.0, seed: int = 0):
+        self.delay = delay
+        self.payload = make_png(image_size)
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def _handler(self):
+        worker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with worker._lock:
+                    worker.calls += 1
+                    roll = worker._random.random()
+                if roll < worker.hang_rate:
+                    time.sleep(worker.hang_seconds)
+                time.sleep(worker.delay)
+                if roll >= 1.0 - worker.failure_rate:
+                    body = b"injected failure"
+                    self.send_response(503)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(worker.payload)))
+                self.end_headers()
+                self.wfile.write(worker.payload)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+        return Handler
+
+    def start(self) -> "StubWorker":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
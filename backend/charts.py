@@ -0,0 +1,235 @@
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from pptx.chart.data import CategoryChartData, XyChartData
+from pptx.enum.chart import XL_CHART_TYPE
+
+CHART_POINT_BUDGET = int(os.getenv("CHART_POINT_BUDGET", "500"))  # Most categories (or XY points per series) written to a chart
+CHART_PIE_SLICES = int(os.getenv("CHART_PIE_SLICES", "12"))  # Larger pies keep the biggest slices plus "Other"
+
+CHART_TYPES = {
+    "bar": XL_CHART_TYPE.BAR_CLUSTERED,
+    "stacked_bar": XL_CHART_TYPE.BAR_STACKED,
+    "column": XL_CHART_TYPE.COLUMN_CLUSTERED,
+    "stacked_column": XL_CHART_TYPE.COLUMN_STACKED,
+    "line": XL_CHART_TYPE.LINE,
+    "line_markers": XL_CHART_TYPE.LINE_MARKERS,
+    "area": XL_CHART_TYPE.AREA,
+    "stacked_area": XL_CHART_TYPE.AREA_STACKED,
+    "pie": XL_CHART_TYPE.PIE,
+    "doughnut": XL_CHART_TYPE.DOUGHNUT,
+    "scatter": XL_CHART_TYPE.XY_SCATTER,
+    "scatter_lines": XL_CHART_TYPE.XY_SCATTER_LINES_NO_MARKERS,
+}
+# How each kind of chart is reduced to the point budget
+LTTB_TYPES = {"line", "line_markers", "scatter", "scatter_lines"}  # Shape matters: keep the visually significant points
+SLICE_TYPES = {"pie", "doughnut"}  # Keep the largest slices
+XY_TYPES = {"scatter", "scatter_lines"}
+AGGREGATES = {"mean", "sum", "min", "max"}  # Bucketed bars and areas; the default is mean
+
+
+class PreparedChart(NamedTuple):
+    chart_type: XL_CHART_TYPE
+    data: object  # CategoryChartData or XyChartData
+    series_count: int
+    source_points: int  # Points per series before downsampling
+    points: int  # Points per series written to the chart
+
+
+def _as_array(values) -> np.ndarray:
+    """Float array with None (and anything non-numeric) as NaN."""
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = np.array([np.nan if v is None else v for v in array.ravel()], dtype=float).reshape(array.shape)
+    return array.astype(float, copy=False)
+
+
+def normalize_chart_data(chart_data: Dict) -> Tuple[np.ndarray, List[Tuple[str, np.ndarray]]]:
+    """
+    Returns (categories, [(series name, values), ...]) from any of the accepted shapes:
+
+    - {"categories": [...], "values": [...]}: one series (the original format)
+    - {"categories": [...], "values": 2-D array}: one series per column, named by "names"
+    - {"categories": [...], "series": {"name": [...], ...}} or [{"name": ..., "values": [...]}, ...]
+    - {"columns": {"col": [...], ...}, "category_column": "col"}: columnar input such as
+      DataFrame.to_dict("list") or a pyarrow table's to_pydict(); every other column is a series
+
+    Values may be lists or NumPy arrays; None and NaN become gaps.
+    """
+    if "columns" in chart_data:
+        columns = dict(chart_data["columns"])
+        category_column = chart_data.get("category_column") or next(iter(columns))
+        categories = columns.pop(category_column)
+        series = list(columns.items())
+    elif "series" in chart_data:
+        categories = chart_data["categories"]
+        raw = chart_data["series"]
+        series = list(raw.items()) if isinstance(raw, dict) else [(s.get("name", f"Series {i + 1}"), s["values"]) for i, s in enumerate(raw)]
+    else:
+        categories = chart_data["categories"]
+        values = _as_array(chart_data["values"])
+        if values.ndim == 2:
+            names = chart_data.get("names") or [f"Series {i + 1}" for i in range(values.shape[1])]
+            series = [(names[i], values[:, i]) for i in range(values.shape[1])]
+        else:
+            series = [(chart_data.get("name", "Series 1"), values)]
+
+    categories = np.asarray(categories)
+    series = [(str(name), _as_array(values)) for name, values in series]
+    for name, values in series:
+        if values.shape != (len(categories),):
+            raise ValueError(f"Chart series {name!r} has {values.size} values for {len(categories)} categories")
+    return categories, series
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the line's shape.
+
+    The first and last points are kept; the rest are split into n_out - 2 buckets and
+    each contributes the point forming the largest triangle with the point kept from the
+    previous bucket and the mean of the next one. One Python step per bucket, with the
+    bucket itself handled by NumPy, so the cost is O(n) array work plus O(n_out) steps.
+    NaN points are never picked unless a whole bucket is NaN.
+    """
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 1)])
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)  # n_out - 2 buckets between the ends
+    edges = np.append(edges, n)  # The last "next bucket" is the final point
+    valid = ~np.isnan(y)
+    y_filled = np.where(valid, y, 0.0)
+    x = x.astype(float, copy=False)
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end, next_end = edges[i], edges[i + 1], edges[i + 2]
+        count = valid[end:next_end].sum()
+        avg_x = x[end:next_end].mean()
+        avg_y = y_filled[end:next_end].sum() / count if count else y_filled[a]
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x) * (ys - y_filled[a]) - (x[a] - xs) * (avg_y - y_filled[a]))
+        area[np.isnan(area)] = -1.0
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _bucket_edges(n: int, n_out: int) -> np.ndarray:
+    return np.linspace(0, n, n_out + 1).astype(np.intp)[:-1]
+
+
+def bucket_aggregate(values: np.ndarray, starts: np.ndarray, how: str = "mean") -> np.ndarray:
+    """Reduces consecutive buckets beginning at `starts` to one value each, ignoring NaN."""
+    valid = ~np.isnan(values)
+    counts = np.add.reduceat(valid.astype(np.intp), starts)
+    if how == "max":
+        result = np.maximum.reduceat(np.where(valid, values, -np.inf), starts)
+    elif how == "min":
+        result = np.minimum.reduceat(np.where(valid, values, np.inf), starts)
+    else:
+        result = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        if how == "mean":
+            result = result / np.maximum(counts, 1)
+    return np.where(counts > 0, result, np.nan)  # An all-gap bucket stays a gap
+
+
+def _axis_x(categories: np.ndarray) -> np.ndarray:
+    """Numeric x positions for LTTB: the categories themselves if numeric, else their index."""
+    if np.issubdtype(categories.dtype, np.number):
+        return categories.astype(float)
+    if np.issubdtype(categories.dtype, np.datetime64):
+        return categories.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return np.arange(len(categories), dtype=float)
+
+
+def downsample(categories: np.ndarray, series: List[Tuple[str, np.ndarray]], kind: str, budget: int,
+               aggregate: str = "mean") -> Tuple[np.ndarray, List[Tuple[str, np.ndarray]]]:
+    """
+    Reduces the data to at most `budget` categories, the method depending on the chart kind:
+    LTTB for lines and scatter (the union of each series' picks, so series share the axis),
+    largest slices plus "Other" for pies, and bucket aggregates (labelled by each bucket's
+    first category) for bars, columns and areas.
+    """
+    n = len(categories)
+    if kind in SLICE_TYPES:
+        budget = min(budget, CHART_PIE_SLICES)
+    if n <= budget:
+        return categories, series
+
+    if kind in LTTB_TYPES:
+        x = _axis_x(categories)
+        if kind in XY_TYPES and np.any(np.diff(x) < 0):
+            order = np.argsort(x, kind="stable")  # LTTB walks the x axis in order
+            categories, x, series = categories[order], x[order], [(name, values[order]) for name, values in series]
+        per_series = max(3, budget // len(series))
+        picks = np.unique(np.concatenate([lttb_indices(x, values, per_series) for _, values in series]))
+        return categories[picks], [(name, values[picks]) for name, values in series]
+
+    if kind in SLICE_TYPES:
+        name, values = series[0]
+        order = np.argsort(np.nan_to_num(values, nan=-np.inf))[::-1]
+        keep = np.sort(order[:budget - 1])  # Largest slices, in their original order
+        other = np.nansum(values[order[budget - 1:]])
+        labels = np.append(categories[keep].astype(str), "Other")
+        return labels, [(name, np.append(values[keep], other))]
+
+    starts = _bucket_edges(n, budget)
+    return categories[starts], [(name, bucket_aggregate(values, starts, aggregate)) for name, values in series]
+
+
+def _tolist(values: np.ndarray) -> list:
+    """Plain Python values for python-pptx, with NaN as None (an empty point)."""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def _category_labels(categories: np.ndarray) -> list:
+    if np.issubdtype(categories.dtype, np.datetime64):
+        return [str(c) for c in categories.astype("datetime64[D]")]
+    if np.issubdtype(categories.dtype, np.number):
+        return categories.tolist()
+    return [str(c) for c in categories.tolist()]
+
+
+def prepare_chart(chart_data: Dict, chart_type: Optional[str] = None, max_points: Optional[int] = None) -> PreparedChart:
+    """
+    Normalizes and downsamples a slide's chart data and builds the python-pptx chart data.
+
+    chart_type (or the data's "type") is a CHART_TYPES key, "bar" by default; max_points
+    (or the data's "max_points") overrides CHART_POINT_BUDGET. Bucketed charts use the
+    data's "aggregate" (mean, sum, min or max).
+    """
+    kind = chart_type or chart_data.get("type") or "bar"
+    if kind not in CHART_TYPES:
+        raise ValueError(f"Unknown chart type {kind!r}; expected one of {sorted(CHART_TYPES)}")
+    aggregate = chart_data.get("aggregate", "mean")
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown chart aggregate {aggregate!r}; expected one of {sorted(AGGREGATES)}")
+    budget = max(3, max_points or chart_data.get("max_points") or CHART_POINT_BUDGET)
+
+    categories, series = normalize_chart_data(chart_data)
+    if kind in SLICE_TYPES:
+        series = series[:1]  # A pie shows one series
+    source_points = len(categories)
+    categories, series = downsample(categories, series, kind, budget, aggregate)
+
+    if kind in XY_TYPES:
+        data = XyChartData()
+        x_values = _axis_x(categories).tolist()
+        for name, values in series:
+            xy = data.add_series(name)
+            for x, y in zip(x_values, _tolist(values)):
+                if y is not None:
+                    xy.add_data_point(x, y)
+    else:
+        data = CategoryChartData()
+        data.categories = _category_labels(categories)
+        for name, values in series:
+            data.add_series(name, _tolist(values))
+    return PreparedChart(CHART_TYPES[kind], data, len(series), source_points, len(categories))
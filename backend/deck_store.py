@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from typing import Dict, Optional, Tuple, Union
+
+DECK_STORE_DIR = os.getenv("DECK_STORE_DIR", os.path.join("generated_decks", "saved"))
+DECK_STORE_TTL_SECONDS = int(os.getenv("DECK_STORE_TTL_SECONDS", "86400"))  # How long a deck stays editable
+DECK_STORE_MAX_ENTRIES = int(os.getenv("DECK_STORE_MAX_ENTRIES", "500"))
+
+_DECK_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class DeckStore:
+    """
+    Saved decks that can be edited one slide at a time.
+
+    Each deck is kept in `store_dir` as `<deck_id>.pptx` plus `<deck_id>.json` holding
+    its state: request fields, outline, template and per-slide layout (slide id, image
+    side and image prompt). Decks untouched for longer than the TTL, or beyond
+    max_entries, are removed oldest first. Edits to one deck are serialized with
+    `lock(deck_id)`.
+    """
+
+    def __init__(self, store_dir: str = DECK_STORE_DIR, ttl: int = DECK_STORE_TTL_SECONDS,
+                 max_entries: int = DECK_STORE_MAX_ENTRIES):
+        self.store_dir = store_dir
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.saves = 0
+        self.edits = 0
+        self.evictions = 0
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _path(self, deck_id: str, ext: str) -> str:
+        if not _DECK_ID.match(deck_id):
+            raise KeyError(deck_id)
+        return os.path.join(self.store_dir, f"{deck_id}.{ext}")
+
+    def lock(self, deck_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(deck_id, threading.Lock())
+
+    @staticmethod
+    def new_id() -> str:
+        """A fresh deck id, for handing out before the deck is saved with put(..., deck_id=...)."""
+        return uuid.uuid4().hex
+
+    def put(self, state: Dict, pptx: Union[bytes, str], deck_id: Optional[str] = None) -> str:
+        """
+        Saves a new deck from its .pptx bytes (or the path of a saved .pptx) and
+        returns its deck id (a new one unless given). The id is also written into the state.
+        """
+        deck_id = deck_id or self.new_id()
+        state = dict(state, deck_id=deck_id, created_at=time.time())
+        self._write(deck_id, state, pptx)
+        with self._lock:
+            self.saves += 1
+        self.cleanup()
+        return deck_id
+
+    def update(self, deck_id: str, state: Dict, pptx_bytes: bytes) -> None:
+        """Replaces a saved deck after an edit."""
+        self._write(deck_id, dict(state, updated_at=time.time()), pptx_bytes)
+        with self._lock:
+            self.edits += 1
+
+    def _write(self, deck_id: str, state: Dict, pptx: Union[bytes, str]) -> None:
+        # The .pptx goes first so a readable state file always has a matching deck
+        pptx_path = self._path(deck_id, "pptx")
+        tmp_path = f"{pptx_path}.tmp"
+        if isinstance(pptx, str):
+            shutil.copyfile(pptx, tmp_path)
+        else:
+            with open(tmp_path, "wb") as f:
+                f.write(pptx)
+        os.replace(tmp_path, pptx_path)
+
+        state_path = self._path(deck_id, "json")
+        with open(f"{state_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(f"{state_path}.tmp", state_path)
+
+    def get_state(self, deck_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(deck_id, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (KeyError, OSError, ValueError):
+            return None
+
+    def get(self, deck_id: str) -> Optional[Tuple[Dict, bytes]]:
+        """Returns (state, pptx bytes) for a saved deck, or None if it is unknown or expired."""
+        state = self.get_state(deck_id)
+        if state is None:
+            return None
+        try:
+            with open(self._path(deck_id, "pptx"), "rb") as f:
+                return state, f.read()
+        except OSError:
+            return None
+
+    def path(self, deck_id: str) -> Optional[str]:
+        """Path of a saved deck's .pptx, or None if it is unknown."""
+        try:
+            path = self._path(deck_id, "pptx")
+        except KeyError:
+            return None
+        return path if os.path.exists(path) else None
+
+    def cleanup(self) -> int:
+        """Removes expired decks and trims to max_entries. Returns how many were removed."""
+        try:
+            names = [name for name in os.listdir(self.store_dir) if name.endswith(".json")]
+        except OSError:
+            return 0
+        decks = []
+        for name in names:
+            try:
+                decks.append((os.path.getmtime(os.path.join(self.store_dir, name)), name[:-len(".json")]))
+            except OSError:
+                continue
+        decks.sort()
+        cutoff = time.time() - self.ttl
+        excess = len(decks) - self.max_entries
+        removed = 0
+        for i, (mtime, deck_id) in enumerate(decks):
+            if mtime >= cutoff and i >= excess:
+                break
+            for ext in ("json", "pptx"):
+                try:
+                    os.remove(os.path.join(self.store_dir, f"{deck_id}.{ext}"))
+                except OSError:
+                    pass
+            with self._lock:
+                self._locks.pop(deck_id, None)
+            removed += 1
+        with self._lock:
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"saves": self.saves, "edits": self.edits, "evictions": self.evictions}
@@ -0,0 +1,198 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from metrics import registry
+
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "45"))  # Longest a caller waits for a model result
+LLM_MAX_ATTEMPTS = int(os.getenv("LLM_MAX_ATTEMPTS", "2"))  # Calls per request including hedges; 1 disables hedging
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))  # Hedge once a call is slower than this share of calls
+LLM_HEDGE_AFTER_SECONDS = float(os.getenv("LLM_HEDGE_AFTER_SECONDS", "10"))  # Until enough latencies are recorded
+LLM_HEDGE_MIN_SAMPLES = 20
+LLM_LATENCY_WINDOW = 200  # Recent successful calls the percentile is taken over
+
+T = TypeVar("T")
+
+ATTEMPTS_TOTAL = registry.counter("llm_attempts_total", "Model calls made for hedged requests.", ["provider", "outcome"])
+HEDGED_TOTAL = registry.counter("llm_hedged_total", "Hedged requests by which attempt produced the result.", ["winner"])
+
+
+class DeadlineExceeded(TimeoutError):
+    """No attempt produced a usable result before the request's deadline."""
+
+
+class Unparseable(ValueError):
+    """A model call returned, but with nothing the caller could use."""
+
+
+def _provider_name(model) -> str:
+    model = getattr(model, "model", model)  # Look through AdmittedModel
+    return str(getattr(model, "name", type(model).__name__))
+
+
+class LatencyTracker:
+    """Rolling window of call latencies for one upstream."""
+
+    def __init__(self, window: int = LLM_LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = LLM_HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """The pct-th percentile latency, or None with fewer than min_samples recorded."""
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered or len(ordered) < min_samples:
+            return None
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+class HedgedCaller:
+    """
+    Runs model calls with a deadline and hedging.
+
+    `call` sends the prompt to the first model. If no usable result has arrived by
+    the hedge delay (the LLM_HEDGE_PERCENTILE latency of recent calls), or the call
+    returned an empty or unparseable response, the next attempt goes to the next model
+    in the list, wrapping around, so a single model is hedged against itself. Any
+    other failure (a quota error, a call shed by admission control, a network error)
+    stops further attempts: sending more calls to an upstream that is refusing them
+    only adds load. The first attempt whose response parses wins; the others are left
+    to finish in the background (bounded by the provider's own timeout) and their
+    results dropped. DeadlineExceeded is raised if nothing has won by the deadline,
+    and the first attempt's error if no attempt is left that could succeed.
+
+    With an admission controller, each attempt takes its token before calling the
+    model. The hedge delay and the latency samples start once the token is granted,
+    so time spent queueing never looks like a slow model, and an attempt still
+    waiting in the queue is never hedged.
+    """
+
+    def __init__(self, name: str, deadline: float = LLM_DEADLINE_SECONDS, max_attempts: int = LLM_MAX_ATTEMPTS,
+                 hedge_percentile: float = LLM_HEDGE_PERCENTILE, hedge_after: float = LLM_HEDGE_AFTER_SECONDS):
+        self.name = name
+        self.deadline = deadline
+        self.max_attempts = max(1, max_attempts)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.latency = LatencyTracker()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadlines_exceeded = 0
+        self._pool = ThreadPoolExecutor(max_workers=64, thread_name_prefix=f"{name}-call")
+        self._lock = threading.Lock()
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on an attempt before hedging it."""
+        observed = self.latency.percentile(self.hedge_percentile)
+        return min(self.hedge_after if observed is None else observed, self.deadline)
+
+    def _attempt(self, model, prompt: str, parse: Callable[[str], T]) -> T:
+        start = time.monotonic()
+        try:
+            response = model.generate_content(prompt)
+            if not response.text:
+                raise Unparseable("Empty response from model")
+            try:
+                result = parse(response.text)
+            except Exception as e:
+                raise Unparseable(str(e)) from e
+        except Exception:
+            ATTEMPTS_TOTAL.inc(provider=_provider_name(model), outcome="error")
+            raise
+        self.latency.record(time.monotonic() - start)
+        ATTEMPTS_TOTAL.inc(provider=_provider_name(model), outcome="ok")
+        return result
+
+    def call(self, models: List, prompt: str, parse: Callable[[str], T], admission=None) -> T:
+        """
+        Returns parse(text) of the first attempt to succeed. `parse` raises on a response
+        it cannot use, which counts as a failed attempt worth hedging. `admission`, an
+        AdmissionController, rate limits the attempts.
+        """
+        deadline = time.monotonic() + self.deadline
+        queued: Dict[Future, int] = {}  # Attempts waiting for an admission token
+        pending: Dict[Future, int] = {}  # Attempts calling the model
+        errors: List[Exception] = []
+        launched = 0
+        hedge_at = deadline
+
+        def submit(fn, *args) -> Future:
+            context = contextvars.copy_context()  # Keep the request's priority and trace
+            return self._pool.submit(context.run, fn, *args)
+
+        def start_call(attempt: int) -> None:
+            nonlocal hedge_at
+            pending[submit(self._attempt, models[attempt % len(models)], prompt, parse)] = attempt
+            hedge_at = time.monotonic() + self.hedge_delay()
+
+        def launch() -> None:
+            nonlocal launched
+            if admission is None:
+                start_call(launched)
+            else:
+                queued[submit(admission.acquire)] = launched
+            launched += 1
+
+        with self._lock:
+            self.calls += 1
+        launch()
+        while True:
+            can_hedge = launched < self.max_attempts and not queued and all(isinstance(e, Unparseable) for e in errors)
+            wake = min(hedge_at, deadline) if can_hedge else deadline
+            done, _ = wait([*queued, *pending], timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                if future in queued:
+                    attempt = queued.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        errors.append(e)  # Shed by admission control
+                    else:
+                        start_call(attempt)
+                    continue
+
+                attempt = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                for other in [*queued, *pending]:
+                    other.cancel()  # Not-yet-started attempts are skipped; running ones finish unobserved
+                if launched > 1:
+                    HEDGED_TOTAL.inc(winner="first" if attempt == 0 else "hedge")
+                    with self._lock:
+                        self.hedge_wins += attempt > 0
+                return result
+
+            can_hedge = launched < self.max_attempts and not queued and all(isinstance(e, Unparseable) for e in errors)
+            if not queued and not pending and not can_hedge:
+                raise errors[0]
+            if time.monotonic() >= deadline:
+                with self._lock:
+                    self.deadlines_exceeded += 1
+                raise DeadlineExceeded(f"{self.name} returned no usable result within {self.deadline:g}s")
+            if can_hedge and (not pending or time.monotonic() >= hedge_at):
+                launch()
+                with self._lock:
+                    self.hedges += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "deadlines_exceeded": self.deadlines_exceeded,
+                "hedge_after_seconds": round(self.hedge_delay(), 3),
+            }
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join("slide_images", "cache"))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+IMAGE_CACHE_MAX_ENTRIES = int(os.getenv("IMAGE_CACHE_MAX_ENTRIES", "2000"))
+DERIVED_CACHE_DIR = os.getenv("DERIVED_CACHE_DIR", os.path.join("slide_images", "derived"))  # Resized variants, thumbnails
+DERIVED_CACHE_MAX_BYTES = int(os.getenv("DERIVED_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+WORKER_VERSION = os.getenv("IMAGE_WORKER_VERSION", "v1")  # Bump to invalidate images from an older worker
+EVICTION_GRACE_SECONDS = 60  # Recently used files may still be read by a deck being built
+
+INDEX_FILE = "index.json"
+
+
+def cache_key(prompt: str, style: str, worker_version: str = WORKER_VERSION) -> str:
+    """Returns a content address for an image request."""
+    payload = json.dumps([prompt, style, worker_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ImageCache:
+    """
+    On-disk cache of generated slide images keyed on (prompt, style, worker version).
+
+    Entries live in `cache_dir` as `<sha256>.<ext>` with a JSON index next to them.
+    Files keyed some other way can be stored with `get_key`/`put_key`; the app keeps
+    derived files (resized variants, thumbnails) in a second instance so they neither
+    take budget from worker images nor show up in their hit rate.
+    The index is kept in least-recently-used order and trimmed whenever the total
+    size or entry count goes over its limit.
+    """
+
+    def __init__(self, cache_dir: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+                 max_entries: int = IMAGE_CACHE_MAX_ENTRIES, worker_version: str = WORKER_VERSION):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.worker_version = worker_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key: str, ext: str = "png") -> str:
+        return os.path.join(self.cache_dir, f"{key}.{ext}")
+
+    def _load_index(self) -> None:
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+
+        # Drop entries whose files went missing and restore LRU order from access times
+        for key, entry in sorted(entries.items(), key=lambda item: item[1].get("last_access", 0)):
+            if os.path.exists(self._path(key, entry.get("ext", "png"))):
+                self._entries[key] = entry
+                self.total_bytes += entry["size"]
+
+    def _save_index(self) -> None:
+        index_path = os.path.join(self.cache_dir, INDEX_FILE)
+        tmp_path = f"{index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, index_path)
+
+    def get(self, prompt: str, style: str) -> Optional[str]:
+        """Returns the cached image path for this prompt and style, or None on a miss."""
+        return self.get_key(cache_key(prompt, style, self.worker_version))
+
+    def peek(self, prompt: str, style: str) -> Optional[str]:
+        """Like get, but without counting a hit or miss or refreshing the entry's LRU position."""
+        key = cache_key(prompt, style, self.worker_version)
+        with self._lock:
+            entry = self._entries.get(key)
+        path = self._path(key, entry.get("ext", "png")) if entry else None
+        return path if path and os.path.exists(path) else None
+
+    def put(self, prompt: str, style: str, image_data: bytes) -> str:
+        """Stores image bytes for this prompt and style and returns the cached path."""
+        return self.put_key(cache_key(prompt, style, self.worker_version), image_data)
+
+    def get_key(self, key: str) -> Optional[str]:
+        """Returns the cached file path for a raw key, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not os.path.exists(self._path(key, entry.get("ext", "png"))):
+                if entry is not None:
+                    self.total_bytes -= entry["size"]
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            entry["last_access"] = time.time()
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._path(key, entry.get("ext", "png"))
+
+    def put_key(self, key: str, image_data: bytes, ext: str = "png") -> str:
+        """Stores bytes under a raw key and returns the cached path."""
+        path = self._path(key, ext)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as img_file:
+            img_file.write(image_data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous["size"]
+            self._entries[key] = {"size": len(image_data), "last_access": time.time(), "ext": ext}
+            self.total_bytes += len(image_data)
+            self._evict()
+            self._save_index()
+        return path
+
+    def _evict(self) -> None:
+        """Removes least-recently-used entries until both limits hold. Caller holds the lock."""
+        cutoff = time.time() - EVICTION_GRACE_SECONDS
+        for key in list(self._entries):
+            if self.total_bytes <= self.max_bytes and len(self._entries) <= self.max_entries:
+                break
+            entry = self._entries[key]
+            if entry["last_access"] > cutoff:
+                break  # Everything after this was used even more recently
+            del self._entries[key]
+            self.total_bytes -= entry["size"]
+            self.evictions += 1
+            try:
+                os.remove(self._path(key, entry.get("ext", "png")))
+            except OSError:
+                pass
+
+    def stats(self) -> Dict:
+        """Returns hit/miss/eviction counters and current cache size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
@@ -0,0 +1,66 @@
+import hashlib
+import io
+import os
+from typing import NamedTuple, Optional
+
+from PIL import Image
+
+IMAGE_DPI = int(os.getenv("IMAGE_DPI", "150"))  # Pixel density of embedded images at their on-slide size
+IMAGE_JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "85"))
+
+
+class PreparedImage(NamedTuple):
+    path: str
+    digest: str  # sha256 of the embedded bytes; identical images share it
+    original_bytes: int
+    embedded_bytes: int
+
+
+def _encode(img: Image.Image) -> tuple:
+    """Re-encodes an image as JPEG, or as optimized PNG when it has transparency. Returns (bytes, ext)."""
+    buffer = io.BytesIO()
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue(), "png"
+    img.convert("RGB").save(buffer, format="JPEG", quality=IMAGE_JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue(), "jpg"
+
+
+def prepare_slide_image(image_path: str, width_in: float, height_in: float, cache, dpi: Optional[int] = None) -> PreparedImage:
+    """
+    Downsamples an image to its on-slide box at the given DPI and re-encodes it.
+
+    The processed variant is cached under a hash of the source bytes and target size,
+    so repeated images are only processed once and come back as the same file. The
+    original is kept whenever processing would not make it smaller.
+    """
+    dpi = dpi or IMAGE_DPI
+    with open(image_path, "rb") as f:
+        data = f.read()
+    source_digest = hashlib.sha256(data).hexdigest()
+    target = (max(1, round(width_in * dpi)), max(1, round(height_in * dpi)))
+    key = hashlib.sha256(f"processed:{source_digest}:{target[0]}x{target[1]}:{IMAGE_JPEG_QUALITY}".encode()).hexdigest()
+
+    cached_path = cache.get_key(key)
+    if cached_path:
+        with open(cached_path, "rb") as f:
+            processed = f.read()
+        return PreparedImage(cached_path, hashlib.sha256(processed).hexdigest(), len(data), len(processed))
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.load()
+            source_ext = {"JPEG": "jpg"}.get(img.format, (img.format or "png").lower())
+            if img.width > target[0] or img.height > target[1]:
+                # Same box PowerPoint stretches it into; never upsample
+                img = img.resize((min(img.width, target[0]), min(img.height, target[1])), Image.LANCZOS)
+            processed, ext = _encode(img)
+    except Exception as e:
+        print(f"⚠️ Could not preprocess image {image_path}: {e}")
+        return PreparedImage(image_path, source_digest, len(data), len(data))
+
+    if len(processed) >= len(data):
+        processed, ext = data, source_ext
+
+    processed_path = cache.put_key(key, processed, ext)
+    return PreparedImage(processed_path, hashlib.sha256(processed).hexdigest(), len(data), len(processed))
@@ -0,0 +1,149 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+IMAGE_WORKER_URL = os.getenv("IMAGE_WORKER_URL", "https://image-generator.worldforscience.workers.dev/")
+IMAGE_WORKER_CONNECT_TIMEOUT = float(os.getenv("IMAGE_WORKER_CONNECT_TIMEOUT", "3.05"))
+IMAGE_WORKER_READ_TIMEOUT = float(os.getenv("IMAGE_WORKER_READ_TIMEOUT", "60"))
+IMAGE_WORKER_RETRIES = int(os.getenv("IMAGE_WORKER_RETRIES", "2"))  # Extra attempts after the first
+IMAGE_WORKER_BACKOFF = float(os.getenv("IMAGE_WORKER_BACKOFF", "0.5"))  # Base delay between attempts, seconds
+IMAGE_WORKER_POOL_SIZE = int(os.getenv("IMAGE_WORKER_POOL_SIZE", "20"))  # Keep-alive connections
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("IMAGE_WORKER_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("IMAGE_WORKER_BREAKER_RESET", "30"))
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an unhealthy upstream after repeated failures.
+
+    closed:    calls go through; consecutive failures are counted
+    open:      calls are refused until reset_timeout has passed
+    half_open: one trial call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_timeout: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """True while calls would be refused. Unlike allow, takes no half-open trial and counts no rejection."""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self.opened_at < self.reset_timeout
+            return self.state == "half_open" and self._trial_in_flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+
+class ImageWorkerClient:
+    """
+    Shared HTTP client for the image worker.
+
+    Reuses keep-alive connections from a pool, bounds every call with connect and
+    read timeouts, retries 5xx responses and timeouts with jittered exponential
+    backoff, and goes through a circuit breaker so an unhealthy worker fails fast.
+    """
+
+    def __init__(self, url: str = IMAGE_WORKER_URL, connect_timeout: float = IMAGE_WORKER_CONNECT_TIMEOUT,
+                 read_timeout: float = IMAGE_WORKER_READ_TIMEOUT, retries: int = IMAGE_WORKER_RETRIES,
+                 backoff: float = IMAGE_WORKER_BACKOFF, pool_size: int = IMAGE_WORKER_POOL_SIZE,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.calls = 0
+        self.retried = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def generate(self, prompt: str, style: str) -> Optional[bytes]:
+        """Returns the image bytes, or None if the worker failed or the breaker is open."""
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                return None
+            if attempt:
+                self._count("calls", "retried")
+            else:
+                self._count("calls")
+            try:
+                response = self.session.post(self.url, json={"prompt": prompt, "style": style}, timeout=self.timeout)
+            except requests.RequestException as e:
+                # Timeouts, refused connections and bodies cut off mid-read all count against the worker,
+                # and recording them also ends a half-open trial
+                self.breaker.record_failure()
+                error = str(e)
+            else:
+                if response.status_code == 200:
+                    self.breaker.record_success()
+                    return response.content
+                if response.status_code < 500:
+                    # The worker is up but rejected this prompt; retrying will not help
+                    self.breaker.record_success()
+                    print(f"❌ Error: {response.status_code} - {response.text}")
+                    self._count("failed")
+                    return None
+                self.breaker.record_failure()
+                error = f"{response.status_code} - {response.text}"
+
+            if attempt < self.retries:
+                time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+        print(f"❌ Error generating image with Cloudflare Worker: {error}")
+        self._count("failed")
+        return None
+
+    def _count(self, *counters: str) -> None:
+        with self._lock:
+            for counter in counters:
+                setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retried,
+            "failures": self.failed,
+            "breaker_state": self.breaker.state,
+            "breaker_rejected": self.breaker.rejected,
+        }
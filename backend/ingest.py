@@ -0,0 +1,206 @@
+import asyncio
+import codecs
+import logging
+import os
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from admission import Overloaded
+from metrics import span
+from outline_parser import parse_outline
+
+logger = logging.getLogger(__name__)
+
+INGEST_MAX_BYTES = int(os.getenv("INGEST_MAX_BYTES", str(20 * 1024 * 1024)))  # Largest accepted document
+INGEST_CONCURRENCY = int(os.getenv("INGEST_CONCURRENCY", "4"))  # Parallel LLM calls per document
+INGEST_MIN_CHUNK_CHARS = 2000
+INGEST_MAX_CHUNK_CHARS = int(os.getenv("INGEST_MAX_CHUNK_CHARS", "12000"))  # Preferred size; larger documents get larger chunks
+INGEST_MAX_SECTIONS = int(os.getenv("INGEST_MAX_SECTIONS", "64"))  # Map calls to aim for per document
+INGEST_CONTEXT_CHARS = int(os.getenv("INGEST_CONTEXT_CHARS", "400000"))  # Largest chunk sent to the model in one call
+
+MAP_PROMPT = """
+        Summarize the following section of a document as one slide of a presentation about "{title}".
+        Reply in exactly this format, with 3-5 concise bullet points:
+        Slide 1
+        Slide title
+        - Point 1
+        - Point 2
+        - Point 3
+
+        Section:
+        {text}
+        """
+
+REDUCE_PROMPT = """
+        Combine these consecutive slide summaries from a presentation about "{title}" into exactly one slide.
+        Keep the most important points. Reply in exactly this format, with 3-5 concise bullet points:
+        Slide 1
+        Slide title
+        - Point 1
+        - Point 2
+        - Point 3
+
+        Summaries:
+        {text}
+        """
+
+
+class DocumentTooLarge(Exception):
+    pass
+
+
+def chunk_size_for(total_bytes: Optional[int], num_slides: int) -> int:
+    """
+    Aims for at least one chunk per slide when the document size is known up front, and
+    for at most INGEST_MAX_SECTIONS chunks by growing them up to INGEST_CONTEXT_CHARS.
+    """
+    if not total_bytes:
+        return INGEST_MAX_CHUNK_CHARS
+    size = max(min(INGEST_MAX_CHUNK_CHARS, total_bytes // max(1, num_slides)), -(-total_bytes // INGEST_MAX_SECTIONS))
+    return max(INGEST_MIN_CHUNK_CHARS, min(INGEST_CONTEXT_CHARS, size))
+
+
+def _split_point(text: str, limit: int) -> int:
+    """Best place to end a chunk of at most `limit` chars: a heading, then a blank line, then a newline."""
+    window = text[:limit]
+    for separator in ("\n#", "\n\n", "\n", ". "):
+        index = window.rfind(separator)
+        if index > limit // 4:
+            return index + 1
+    return limit
+
+
+async def iter_chunks(pieces: AsyncIterable[bytes], chunk_chars: int, max_bytes: int = INGEST_MAX_BYTES,
+                      grow_after: int = 0) -> AsyncIterator[str]:
+    """
+    Decodes a byte stream and yields text chunks of at most `chunk_chars`, split on
+    section boundaries. Only the current partial chunk is held in memory.
+
+    For a stream of unknown size, `grow_after` bounds the number of chunks: the chunk
+    size doubles (up to INGEST_CONTEXT_CHARS) after every `grow_after` chunks.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    received = 0
+    yielded = 0
+    async for piece in pieces:
+        received += len(piece)
+        if received > max_bytes:
+            raise DocumentTooLarge(f"Document exceeds {max_bytes} bytes")
+        buffer += decoder.decode(piece)
+        while len(buffer) >= chunk_chars:
+            cut = _split_point(buffer, chunk_chars)
+            chunk, buffer = buffer[:cut].strip(), buffer[cut:]
+            if chunk:
+                yield chunk
+                yielded += 1
+                if grow_after and yielded % grow_after == 0:
+                    chunk_chars = max(chunk_chars, min(INGEST_CONTEXT_CHARS, chunk_chars * 2))
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def _fallback_slide(text: str) -> Dict:
+    """Local summary used when the model fails: first line as title, first sentences as bullets."""
+    lines = [line.strip("# ").strip() for line in text.splitlines() if line.strip()]
+    title = (lines[0] if lines else "Summary")[:80]
+    sentences = [s.strip() for s in " ".join(lines[1:] or lines).split(". ") if s.strip()]
+    return {"title": title, "content": [s[:200] for s in sentences[:4]] or ["No content available"]}
+
+
+def _fallback_merge(slides: List[Dict]) -> Dict:
+    """Local reduce used when the model is unavailable: first title, the lead bullet of each section."""
+    return {"title": slides[0]["title"], "content": [slide["content"][0] for slide in slides if slide["content"]][:5]}
+
+
+def _ask_for_slide(model, prompt: str, fallback_text: str) -> Dict:
+    try:
+        slides = parse_outline(model.generate_content(prompt).text or "")
+        if slides and slides[0]["content"]:
+            return slides[0]
+    except Overloaded:
+        raise
+    except Exception as e:
+        logger.error(f"Error summarizing document section: {str(e)}")
+    return _fallback_slide(fallback_text)
+
+
+def summarize_section(model, title: str, text: str) -> Dict:
+    """Map step: one document section -> one slide."""
+    with span("ingest_map"):
+        return _ask_for_slide(model, MAP_PROMPT.format(title=title, text=text), text)
+
+
+def combine_sections(model, title: str, slides: List[Dict]) -> Dict:
+    """Reduce step: several consecutive section slides -> one slide."""
+    if len(slides) == 1:
+        return slides[0]
+    text = "\n".join(f"{slide['title']}\n" + "\n".join(f"- {b}" for b in slide["content"]) for slide in slides)
+    with span("ingest_reduce"):
+        return _ask_for_slide(model, REDUCE_PROMPT.format(title=title, text=text), text)
+
+
+def _group(items: List, groups: int) -> List[List]:
+    """Splits items into `groups` contiguous, nearly equal runs."""
+    size, extra = divmod(len(items), groups)
+    runs, start = [], 0
+    for i in range(groups):
+        end = start + size + (1 if i < extra else 0)
+        runs.append(items[start:end])
+        start = end
+    return runs
+
+
+async def summarize_document(chunks: AsyncIterable[str], title: str, num_slides: int, model,
+                             concurrency: int = INGEST_CONCURRENCY) -> List[Dict]:
+    """
+    Map-reduce summary of a streamed document into `num_slides` slides (fewer only if
+    the document has fewer sections than that).
+
+    Chunks are summarized concurrently, at most `concurrency` at a time; reading the
+    stream pauses while all slots are busy, which bounds memory to roughly
+    (concurrency + 1) chunks. Consecutive section summaries are then merged into
+    exactly one slide per group.
+
+    A call shed by admission control falls back to a local summary of its text like
+    any other failed call, so the finished sections are kept. Overloaded is raised
+    only if every section was shed.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    tasks = []
+    shed: List[Overloaded] = []
+
+    async def map_chunk(text: str) -> Dict:
+        try:
+            return await run_in_threadpool(summarize_section, model, title, text)
+        except Overloaded as e:
+            shed.append(e)
+            return _fallback_slide(text)
+        finally:
+            slots.release()
+
+    try:
+        async for chunk in chunks:
+            await slots.acquire()
+            tasks.append(asyncio.create_task(map_chunk(chunk)))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+    sections = await asyncio.gather(*tasks)
+    if sections and len(shed) == len(sections):
+        raise shed[0]
+    if len(sections) <= num_slides:
+        return list(sections)
+
+    async def reduce_group(group: List[Dict]) -> Dict:
+        async with slots:
+            try:
+                return await run_in_threadpool(combine_sections, model, title, group)
+            except Overloaded:
+                return _fallback_merge(group)
+
+    return list(await asyncio.gather(*(reduce_group(group) for group in _group(list(sections), num_slides))))
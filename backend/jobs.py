@@ -0,0 +1,105 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))  # Decks built at the same time
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", "3600"))  # How long finished decks stay downloadable
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", "generated_decks")
+
+
+class Job:
+    """State of one background deck build, updated by the worker thread."""
+
+    def __init__(self, job_id: str, output_dir: str):
+        self.id = job_id
+        self.output_dir = output_dir
+        self.status = "queued"  # queued -> running -> done | failed
+        self.stage = "queued"
+        self.slides_done = 0
+        self.slides_total = 0
+        self.file_path: Optional[str] = None
+        self.deck_id: Optional[str] = None  # Set when the finished deck is saved for editing
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def report(self, stage: str, done: int = 0, total: int = 0) -> None:
+        """Progress callback passed down to the deck builder."""
+        self.stage = stage
+        if total:
+            self.slides_done = done
+            self.slides_total = total
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "slides_done": self.slides_done,
+            "slides_total": self.slides_total,
+            "error": self.error,
+            "deck_id": self.deck_id,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs deck builds on a bounded thread pool and keeps their results for a TTL.
+
+    `submit` takes a callable `fn(job)` that builds the deck inside `job.output_dir`,
+    reports progress through `job.report` and returns the saved file path.
+    """
+
+    def __init__(self, max_workers: int = JOB_WORKERS, ttl: int = JOB_TTL_SECONDS, output_dir: str = JOB_OUTPUT_DIR):
+        self.ttl = ttl
+        self.output_dir = output_dir
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deck-job")
+
+    def submit(self, fn: Callable[[Job], str]) -> Job:
+        self.cleanup()
+        job_id = uuid.uuid4().hex
+        job = Job(job_id, os.path.join(self.output_dir, job_id))
+        with self._lock:
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], str]) -> None:
+        job.status = "running"
+        try:
+            os.makedirs(job.output_dir, exist_ok=True)
+            job.file_path = fn(job)
+            job.stage = "done"
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.cleanup()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cleanup(self) -> int:
+        """Drops finished jobs older than the TTL along with their files. Returns how many were removed."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.finished_at and job.finished_at < cutoff]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            shutil.rmtree(job.output_dir, ignore_errors=True)
+        return len(expired)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
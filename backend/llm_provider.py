@@ -0,0 +1,79 @@
+import logging
+import os
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.0-flash"
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))  # Per call, enforced by the SDK
+
+
+class GeminiProvider:
+    """
+    Gemini outline model behind a `generate_content(prompt, stream=False)` interface.
+
+    That interface is all the app needs from a provider: the call returns an object
+    with a `.text` (or, streamed, an iterable of them) and raises on failure. Providers
+    also have a `name` for metrics and may have a `preload()`.
+
+    The google.generativeai SDK is heavy to import, so it is only imported and
+    configured on first use (or by `preload` in the background). The API key is
+    read from GEMINI_KEY at that point, not at app import.
+    """
+
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL, api_key: Optional[str] = None,
+                 timeout: float = LLM_REQUEST_TIMEOUT_SECONDS):
+        self.model_name = model_name
+        self.api_key = api_key
+        self.timeout = timeout
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    api_key = self.api_key or os.getenv("GEMINI_KEY")
+                    if not api_key:
+                        raise RuntimeError("GEMINI_API_KEY is required")
+                    import google.generativeai as genai
+                    genai.configure(api_key=api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        # The timeout bounds calls a hedged request has given up on, so they do not pile up
+        request_options = {"timeout": self.timeout} if self.timeout > 0 else None
+        return self._get_model().generate_content(prompt, stream=stream, request_options=request_options)
+
+    def preload(self) -> None:
+        """Imports and configures the SDK in a background thread so startup does not wait for it."""
+        def load():
+            try:
+                self._get_model()
+            except Exception as e:
+                logger.warning(f"LLM provider preload failed: {str(e)}")
+
+        threading.Thread(target=load, name="llm-preload", daemon=True).start()
+
+
+# Provider factories by name; LLM_BACKUP_PROVIDER and make_provider take "name" or "name:model"
+PROVIDERS: Dict[str, Callable[..., object]] = {"gemini": GeminiProvider}
+
+
+def register_provider(name: str, factory: Callable[..., object]) -> None:
+    """Makes a provider available to make_provider; `factory(model_name)` or `factory()` builds one."""
+    PROVIDERS[name] = factory
+
+
+def make_provider(spec: str):
+    """Builds a provider from "name" or "name:model" (e.g. "gemini:gemini-1.5-flash"). None for an empty spec."""
+    if not spec.strip():
+        return None
+    name, _, model_name = spec.strip().partition(":")
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider {name!r}; expected one of {sorted(PROVIDERS)}")
+    return PROVIDERS[name](model_name) if model_name else PROVIDERS[name]()
@@ -1,11 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
 from pydantic import BaseModel
-from typing import Optional
-from services import generate_pptx  # Assuming this is in services.py
-import uvicorn
-import google.generativeai as genai  
+from typing import Dict, Iterator, List, Optional, Tuple
+from services import deck_file_name, derived_cache, edit_slide, generate_pptx, generate_pptx_bytes, image_cache, image_admission, image_flight, image_worker, render_slide_thumbnails, sanitize_filename, thumbnail_path, thumbnail_pool  # Assuming this is in services.py
+from jobs import JobManager
+from deck_store import DeckStore
+from singleflight import SingleFlight
+from admission import AdmissionController, AdmittedModel, Overloaded, set_priority
+from outline_cache import OutlineCache, outline_id
+from outline_parser import iter_outline, parse_outline
+from metrics import registry, render_stats, span, trace_request
+from llm_provider import GEMINI_MODEL, GeminiProvider, make_provider
+from hedging import HedgedCaller
+from ingest import DocumentTooLarge, INGEST_MAX_BYTES, INGEST_MAX_SECTIONS, chunk_size_for, iter_chunks, summarize_document
+from contextlib import asynccontextmanager
+import hashlib
+import json
+import re
+import shutil
+import tempfile
+from urllib.parse import quote
 from dotenv import load_dotenv
 import os
 import logging
@@ -16,23 +34,64 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-app = FastAPI(title="Presentation Generator API")
+# Outline model; the SDK is imported on first use so startup stays fast and works offline
+llm_provider = GeminiProvider(GEMINI_MODEL)
+# Optional second provider for hedged outline calls, e.g. "gemini:gemini-1.5-flash"; hedges go to the primary without one
+llm_backup_provider = make_provider(os.getenv("LLM_BACKUP_PROVIDER", ""))
+LLM_PRELOAD = os.getenv("LLM_PRELOAD", "1") != "0"
+
+# Gemini quota: a burst of requests queues (previews first) instead of failing upstream
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "5"))  # 0 disables the limit
+LLM_BURST = float(os.getenv("LLM_BURST", "10"))
+llm_admission = AdmissionController("gemini", LLM_RATE_PER_SECOND, LLM_BURST)
+
+# Outline calls get a deadline, and a second attempt when the first is slower than usual
+llm_hedge = HedgedCaller("llm")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not os.getenv("GEMINI_KEY"):
+        logger.error("GEMINI_KEY not found in environment variables; outline generation will fail")
+    elif LLM_PRELOAD:
+        llm_provider.preload()  # Warm the SDK in the background; requests are served meanwhile
+        if hasattr(llm_backup_provider, "preload"):
+            llm_backup_provider.preload()
+    thumbnail_pool.warm()  # Start the render processes now; spawning them takes seconds
+    yield
+    thumbnail_pool.shutdown()
+    job_manager.shutdown()  # Stop the deck build workers with the app
+
+app = FastAPI(title="Presentation Generator API", lifespan=lifespan)
 
 # Enable CORS with safer configuration
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["https://smart-presentation-generator.vercel.app"],
     allow_credentials=True,
-    allow_methods=["POST"],  
+    allow_methods=["GET", "POST"],  
     allow_headers=["Content-Type"],
+    expose_headers=["X-Deck-Id", "X-Image-Bytes-Saved", "Content-Disposition"],  # Readable by the cross-origin frontend
 )
 
-# Gemini API Key validation
-GEMINI_API_KEY = os.getenv("GEMINI_KEY")
-if not GEMINI_API_KEY:
-    logger.error("GEMINI_KEY not found in environment variables")
-    raise RuntimeError("GEMINI_API_KEY is required")
-genai.configure(api_key=GEMINI_API_KEY)
+# Outlines shared between preview and generate
+outline_cache = OutlineCache()
+
+# Background deck builds for the job API
+job_manager = JobManager()
+
+# Generated decks kept on disk so single slides can be edited without a full rebuild
+deck_store = DeckStore()
+
+# Identical requests arriving together share one outline call and one deck build
+outline_flight = SingleFlight("outline")
+deck_flight = SingleFlight("deck")
+
+THUMBNAIL_KEY = re.compile(r"[0-9a-f]{64}")
+
+PPTX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+
+# "memory" serializes decks into a buffer; "file" writes to a unique temp dir removed after the response
+DECK_OUTPUT_MODE = os.getenv("DECK_OUTPUT_MODE", "memory")
 
 # Pydantic model for request validation
 class PresentationRequest(BaseModel):
@@ -42,25 +101,28 @@ class PresentationRequest(BaseModel):
     template_name: str 
     description: Optional[str] = None
     image_style: Optional[str] = "realistic"  
+    outline_id: Optional[str] = None  # Returned by preview; lets generate reuse that outline
 
-# Function to generate structured PowerPoint content
-def get_ppt_content(title: str, num_slides: int, description: Optional[str] = None) -> list:
+class SlideEditRequest(BaseModel):
+    title: Optional[str] = None
+    content: Optional[List[str]] = None
+    regenerate_text: bool = False  # Ask the model for new bullets (for the new title, if given)
+    regenerate_image: bool = False  # Fetch a new image even if one is cached for the title
+
+def slides_from_description(description: str, num_slides: int) -> list:
+    """Turns a user-supplied description into slides, one paragraph per slide."""
     structured_slides = []
+    paragraphs = [p.strip() for p in description.split("\n\n") if p.strip()]
+    for i, paragraph in enumerate(paragraphs[:num_slides]):
+        bullets = [b.strip() for b in paragraph.split(". ") if b.strip()][:4]
+        structured_slides.append({
+            "title": f"Slide {i+1}",
+            "content": bullets or ["No content available"]
+        })
+    return structured_slides
 
-    try:
-        # Use description if provided
-        if description and description.strip():
-            paragraphs = [p.strip() for p in description.split("\n\n") if p.strip()]
-            for i, paragraph in enumerate(paragraphs[:num_slides]):
-                bullets = [b.strip() for b in paragraph.split(". ") if b.strip()][:4]
-                structured_slides.append({
-                    "title": f"Slide {i+1}",
-                    "content": bullets or ["No content available"]
-                })
-            return structured_slides
-
-        # Fallback to Gemini API
-        prompt = f"""
+def build_outline_prompt(title: str, num_slides: int) -> str:
+    return f"""
         Create a {num_slides}-slide PPT blueprint for "{title}" with:
         - Slide number
         - Title
@@ -81,76 +143,262 @@ def get_ppt_content(title: str, num_slides: int, description: Optional[str] = No
         @
         """
 
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        
-        if not response.text:
-            raise ValueError("Empty response from Gemini API")
-
-        slides = []
-        current_slide = None
-        lines = response.text.strip().split("\n")
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            if line.startswith("Slide "):
-                if current_slide:
-                    slides.append(current_slide)
-                current_slide = {"title": "", "content": []}
-            elif line == "@":
-                continue
-            elif current_slide and not current_slide["title"]:
-                current_slide["title"] = line
-            elif current_slide:
-                if line.startswith("- "):  # Handle bullet points explicitly
-                    current_slide["content"].append(line[2:].strip())
-                elif current_slide["content"]:  # Only add if after bullets started
-                    current_slide["content"][-1] += f" {line}"
-
-        if current_slide and current_slide["title"]:
-            slides.append(current_slide)
-
-        return slides if slides else [{"title": "Error", "content": ["No content generated"]}]
+def build_slide_prompt(deck_title: str, slide_title: str) -> str:
+    return f"""
+        Write one slide titled "{slide_title}" for a presentation about "{deck_title}", with 3-5 concise bullet points.
+        Reply in exactly this format:
+        Slide 1
+        {slide_title}
+        - Point 1
+        - Point 2
+        - Point 3
+        """
+
+def get_model():
+    return llm_provider
+
+def get_backup_model():
+    return llm_backup_provider
+
+def admitted_model():
+    """The outline model behind the Gemini rate limit; every model call goes through this."""
+    return AdmittedModel(get_model(), llm_admission)
+
+def hedge_models() -> list:
+    """
+    Models for a hedged call, in attempt order: the primary, then the backup if there is one.
+    Not wrapped in AdmittedModel: the hedged call takes each attempt's token itself, so queueing is not timed as model latency.
+    """
+    return [model for model in (get_model(), get_backup_model()) if model is not None]
+
+def hedged_outline_call(prompt: str) -> list:
+    """Hedged model call behind the Gemini rate limit, parsed into slides."""
+    return llm_hedge.call(hedge_models(), prompt, parse_slides, admission=llm_admission)
+
+def parse_slides(text: str) -> list:
+    """parse_outline for hedged calls: a response without slides counts as a failed attempt."""
+    with span("parse"):
+        slides = parse_outline(text)
+    if not slides:
+        raise ValueError("No slides in model response")
+    return slides
+
+def regenerate_slide_text(deck_title: str, slide_title: str) -> Dict:
+    """Asks the model for a single slide's bullets. Errors are raised to the caller."""
+    with span("llm"):
+        slides = hedged_outline_call(build_slide_prompt(deck_title, slide_title))
+    if not slides[0]["content"]:
+        raise ValueError("Empty response from Gemini API")
+    return {"title": slide_title, "content": slides[0]["content"]}
+
+# Function to generate structured PowerPoint content
+def get_ppt_content(title: str, num_slides: int, description: Optional[str] = None) -> list:
+    try:
+        # Use description if provided
+        if description and description.strip():
+            return slides_from_description(description, num_slides)
+
+        # Fallback to Gemini API; the first attempt to return a parseable outline wins
+        with span("llm"):
+            return hedged_outline_call(build_outline_prompt(title, num_slides))
 
+    except Overloaded:
+        raise
     except Exception as e:
         logger.error(f"Error generating content: {str(e)}")
         return [{"title": "Error", "content": [f"Content generation failed: {str(e)}"]}]
 
+def stream_ppt_content(title: str, num_slides: int, description: Optional[str] = None) -> Iterator[dict]:
+    """
+    Yields slides one at a time as Gemini streams the outline. Errors are raised to the caller.
+    """
+    if description and description.strip():
+        yield from slides_from_description(description, num_slides)
+        return
+
+    with span("llm_stream"):
+        response = admitted_model().generate_content(build_outline_prompt(title, num_slides), stream=True)
+        yield from iter_outline(chunk.text for chunk in response if chunk.text)
+
+@app.middleware("http")
+async def trace_api_requests(request: Request, call_next):
+    """Times every API request and logs its per-stage breakdown."""
+    if not request.url.path.startswith("/api/"):
+        return await call_next(request)
+
+    endpoint = request.url.path
+    for route in app.routes:
+        if route.matches(request.scope)[0] == Match.FULL:
+            endpoint = route.path  # Templated path keeps job ids out of metric labels
+            break
+
+    with trace_request(endpoint, defer=True) as trace:
+        response = await call_next(request)
+        trace.status = str(response.status_code)
+    # Streamed bodies are still being produced; the trace ends when the last chunk is sent
+    response.body_iterator = trace.finish_after(response.body_iterator)
+    return response
+
+def attachment_headers(file_name: str) -> dict:
+    """Content-Disposition header for a download, RFC 5987-encoded when the name is not plain ASCII."""
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return {"Content-Disposition": f"attachment; filename*=utf-8''{quoted}"}
+    return {"Content-Disposition": f'attachment; filename="{file_name}"'}
+
+def log_deck_stats(request: PresentationRequest, stats: dict) -> None:
+    logger.info(
+        f"Deck '{request.title.strip()}': {stats.get('deck_bytes', 0)} bytes, "
+        f"{stats.get('images', 0)} unique images, {stats.get('image_bytes_saved', 0)} image bytes saved"
+    )
+
+def save_deck(request: PresentationRequest, ppt_content: list, layout: List[Dict], pptx,
+              deck_id: Optional[str] = None) -> Optional[str]:
+    """Keeps a generated deck (bytes or saved path) for later slide edits. Returns its deck id."""
+    state = {
+        "title": request.title,
+        "author": request.author,
+        "template_name": request.template_name,
+        "image_style": request.image_style,
+        "slides": ppt_content[:len(layout)],
+        "layout": layout,
+    }
+    try:
+        with span("deck_store"):
+            return deck_store.put(state, pptx, deck_id)
+    except Exception as e:
+        logger.error(f"Error saving deck for editing: {str(e)}")
+        return None
+
+def deck_build_key(request: PresentationRequest, ppt_content: list) -> str:
+    """Identifies a deck build by everything that ends up in the file."""
+    payload = json.dumps([request.title.strip(), request.author.strip(), request.num_slides, request.template_name,
+                          request.image_style, ppt_content], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def build_deck_bytes(request: PresentationRequest, ppt_content: list) -> Tuple[bytes, dict, list]:
+    """Builds a deck in memory and returns (pptx bytes, stats, slide layout)."""
+    stats, layout = {}, []
+    pptx_bytes = generate_pptx_bytes(request, ppt_content, request.image_style, request.template_name, stats=stats, layout=layout)
+    return pptx_bytes, stats, layout
+
+def too_busy(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def outline_gone() -> HTTPException:
+    return HTTPException(status_code=410, detail="Outline expired; preview the slides or upload the document again")
+
+def validate_request(request: PresentationRequest) -> None:
+    """Raises a 400 for requests that cannot produce a deck."""
+    if request.num_slides <= 0:
+        raise HTTPException(status_code=400, detail="Number of slides must be positive")
+    if not request.title.strip() or not request.author.strip():
+        raise HTTPException(status_code=400, detail="Title and author cannot be empty")
+
+def build_presentation_job(request: PresentationRequest, job) -> str:
+    """Runs the full outline + deck build for a background job and returns the saved path."""
+    with trace_request("job"):
+        set_priority("background")
+        return _build_presentation_job(request, job)
+
+def _build_presentation_job(request: PresentationRequest, job) -> str:
+    job.report("outline")
+    _, ppt_content = get_outline(request)
+
+    if not ppt_content or all(slide.get("title") == "Error" for slide in ppt_content):
+        raise ValueError("Failed to generate presentation content")
+
+    stats, layout = {}, []
+    pptx_path = generate_pptx(request, ppt_content, request.image_style, request.template_name,
+                              output_dir=job.output_dir, progress=job.report, stats=stats, layout=layout)
+    log_deck_stats(request, stats)
+    job.deck_id = save_deck(request, ppt_content, layout, pptx_path)
+    return pptx_path
+
+def get_outline(request: PresentationRequest) -> Tuple[str, list]:
+    """
+    Returns (outline_id, slides), reusing a cached outline instead of calling the model when possible.
+    An expired outline_id that cannot be recomputed from the request (e.g. an ingested document's) is a 410.
+    """
+    key = outline_id(request.title, request.num_slides, request.description, GEMINI_MODEL)
+    lookup_id = request.outline_id or key
+    slides = outline_cache.get(lookup_id)
+    if slides:
+        return lookup_id, slides
+    if lookup_id != key:
+        raise outline_gone()
+
+    with span("outline"):
+        slides = outline_flight.do(key, get_ppt_content, request.title, request.num_slides, request.description)
+    if slides and not all(slide.get("title") == "Error" for slide in slides):
+        outline_cache.put(key, slides)
+    return key, slides
+
 @app.post("/api/generate_presentation", response_model=dict)
 async def generate_presentation(request: PresentationRequest):
     """
-    Generate a PowerPoint presentation and return its file path.
+    Generate a PowerPoint presentation and return it as a download.
     """
     try:
         # Validate request
-        if request.num_slides <= 0:
-            raise HTTPException(status_code=400, detail="Number of slides must be positive")
-        if not request.title.strip() or not request.author.strip():
-            raise HTTPException(status_code=400, detail="Title and author cannot be empty")
+        validate_request(request)
+
+        # Turn the request away now if its images could not all start in time (none will while the worker is down)
+        set_priority("generate")
+        if not image_worker.breaker.is_open():
+            image_admission.check(cost=request.num_slides)
 
-        # Generate content
-        ppt_content = get_ppt_content(request.title, request.num_slides, request.description)
+        # Generate content (off the event loop so other requests keep being served)
+        _, ppt_content = await run_in_threadpool(get_outline, request)
         
         if not ppt_content or all(slide.get("title") == "Error" for slide in ppt_content):
             raise HTTPException(status_code=500, detail="Failed to generate presentation content")
 
         # Generate PPTX 
-        pptx_path = generate_pptx(request, ppt_content, request.image_style, request.template_name)
+        if DECK_OUTPUT_MODE != "file":
+            # Identical requests in flight get the same bytes; each still saves its own editable copy
+            pptx_bytes, stats, layout = await run_in_threadpool(deck_flight.do, deck_build_key(request, ppt_content),
+                                                                build_deck_bytes, request, ppt_content)
+            log_deck_stats(request, stats)
+            # The editable copy is written after the response is sent, keeping disk I/O off the request path
+            deck_id = deck_store.new_id()
+            headers = attachment_headers(deck_file_name(request))
+            headers["X-Image-Bytes-Saved"] = str(stats.get("image_bytes_saved", 0))
+            headers["X-Deck-Id"] = deck_id
+            return Response(content=pptx_bytes, media_type=PPTX_MEDIA_TYPE, headers=headers,
+                            background=BackgroundTask(save_deck, request, ppt_content, layout, pptx_bytes, deck_id))
+
+        stats, layout = {}, []
+        output_dir = tempfile.mkdtemp(prefix="deck-")
+        try:
+            pptx_path = await run_in_threadpool(generate_pptx, request, ppt_content, request.image_style, request.template_name,
+                                                output_dir=output_dir, stats=stats, layout=layout)
+            log_deck_stats(request, stats)
+        except Exception:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            raise
         
         if not os.path.exists(pptx_path):
+            shutil.rmtree(output_dir, ignore_errors=True)
             raise HTTPException(status_code=500, detail="Failed to create presentation file")
 
-        # Return file response instead of just path
+        # Return file response instead of just path; once it has been sent the deck is saved for edits and the temp dir goes
+        deck_id = deck_store.new_id()
+        after_response = BackgroundTasks()
+        after_response.add_task(save_deck, request, ppt_content, layout, pptx_path, deck_id)
+        after_response.add_task(shutil.rmtree, output_dir, ignore_errors=True)
         return FileResponse(
             path=pptx_path,
             filename=os.path.basename(pptx_path),
-            media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation"
+            media_type=PPTX_MEDIA_TYPE,
+            headers={"X-Deck-Id": deck_id},
+            background=after_response
         )
 
     except HTTPException as e:
         raise e
+    except Overloaded as e:
+        raise too_busy(e)
     except Exception as e:
         logger.error(f"Error in generate_presentation: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -162,26 +410,287 @@ async def preview_slides(request: PresentationRequest):
     """
     try:
         # Validate request
-        if request.num_slides <= 0:
-            raise HTTPException(status_code=400, detail="Number of slides must be positive")
-        if not request.title.strip() or not request.author.strip():
-            raise HTTPException(status_code=400, detail="Title and author cannot be empty")
+        validate_request(request)
+        set_priority("preview")
 
         # Generate slide content preview
-        ppt_content = get_ppt_content(request.title, request.num_slides, request.description)
+        ppt_outline_id, ppt_content = await run_in_threadpool(get_outline, request)
 
         if not ppt_content or all(slide.get("title") == "Error" for slide in ppt_content):
             raise HTTPException(status_code=500, detail="Failed to generate slide preview")
 
         # Return slide preview as JSON
-        return {"slides": ppt_content, "image_style": request.image_style}  # Include image style in preview
+        return {"slides": ppt_content, "image_style": request.image_style, "outline_id": ppt_outline_id}  # Include image style in preview
 
     except HTTPException as e:
         raise e
+    except Overloaded as e:
+        raise too_busy(e)
     except Exception as e:
         logger.error(f"Error in preview_slides: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+def stream_outline_events(request: PresentationRequest) -> Iterator[str]:
+    """
+    Produces NDJSON events for the streaming preview: one "slide" event per slide
+    as soon as it is parsed, then "done" with the outline id (or "error").
+    """
+    key = outline_id(request.title, request.num_slides, request.description, GEMINI_MODEL)
+    lookup_id = request.outline_id or key
+    cached = outline_cache.get(lookup_id)
+    slides = []
+    try:
+        if not cached and lookup_id != key:
+            raise outline_gone()
+        source = cached if cached else stream_ppt_content(request.title, request.num_slides, request.description)
+        for slide in source:
+            slides.append(slide)
+            yield json.dumps({"type": "slide", "index": len(slides) - 1, "slide": slide}) + "\n"
+
+        if not slides:
+            raise ValueError("No content generated")
+        if not cached:
+            outline_cache.put(key, slides)
+        yield json.dumps({"type": "done", "outline_id": lookup_id if cached else key,
+                          "num_slides": len(slides), "image_style": request.image_style}) + "\n"
+
+    except Overloaded as e:
+        yield json.dumps({"type": "error", "detail": str(e), "retry_after": e.retry_after}) + "\n"
+    except HTTPException as e:
+        yield json.dumps({"type": "error", "detail": e.detail, "status": e.status_code}) + "\n"
+    except Exception as e:
+        logger.error(f"Error in preview_slides_stream: {str(e)}")
+        yield json.dumps({"type": "error", "detail": f"Content generation failed: {str(e)}"}) + "\n"
+
+@app.post("/api/preview_slides/stream")
+async def preview_slides_stream(request: PresentationRequest):
+    """
+    Stream the slide preview as NDJSON, emitting each slide as soon as the model finishes it.
+    """
+    validate_request(request)
+    set_priority("preview")
+    try:
+        llm_admission.check()
+    except Overloaded as e:
+        raise too_busy(e)
+    return StreamingResponse(stream_outline_events(request), media_type="application/x-ndjson")
+
+@app.post("/api/preview_slides/thumbnails", response_model=dict)
+async def preview_slide_thumbnails(request: PresentationRequest):
+    """
+    Render approximate JPEG thumbnails of the previewed slides, drawn from the template
+    and any cached slide images. Returns one URL per content slide.
+    """
+    try:
+        validate_request(request)
+        set_priority("preview")
+
+        ppt_outline_id, ppt_content = await run_in_threadpool(get_outline, request)
+        if not ppt_content or all(slide.get("title") == "Error" for slide in ppt_content):
+            raise HTTPException(status_code=500, detail="Failed to generate slide preview")
+
+        keys = await run_in_threadpool(render_slide_thumbnails, ppt_content, request.template_name, request.image_style)
+        return {"outline_id": ppt_outline_id, "thumbnails": [f"/api/thumbnails/{key}" for key in keys]}
+
+    except HTTPException as e:
+        raise e
+    except Overloaded as e:
+        raise too_busy(e)
+    except Exception as e:
+        logger.error(f"Error in preview_slide_thumbnails: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@app.get("/api/thumbnails/{key}")
+async def get_thumbnail(key: str):
+    """
+    Serve a rendered thumbnail. Keys are content hashes, so the response never changes.
+    """
+    path = thumbnail_path(key) if THUMBNAIL_KEY.fullmatch(key) else None
+    if not path:
+        raise HTTPException(status_code=404, detail="Thumbnail not found or expired")
+    return FileResponse(path=path, media_type="image/jpeg", headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+@app.post("/api/ingest_document", response_model=dict)
+async def ingest_document(request: Request, title: str, author: str, num_slides: int,
+                          template_name: str = "modern_minimalist", image_style: str = "realistic"):
+    """
+    Summarize a large text or markdown document (sent as the raw request body) into
+    num_slides slides. Returns them with an outline_id that generate can build from.
+    """
+    presentation_request = PresentationRequest(title=title, author=author, num_slides=num_slides,
+                                               template_name=template_name, image_style=image_style)
+    validate_request(presentation_request)
+    set_priority("background")  # Many model calls for one upload; interactive requests go first
+
+    content_length = int(request.headers.get("content-length") or 0)
+    if content_length > INGEST_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"Document exceeds {INGEST_MAX_BYTES} bytes")
+
+    digest = hashlib.sha256()
+
+    async def body_pieces():
+        async for piece in request.stream():
+            digest.update(piece)
+            yield piece
+
+    try:
+        # Without a Content-Length, chunks grow as the document does to keep the number of model calls bounded
+        chunks = iter_chunks(body_pieces(), chunk_size_for(content_length, num_slides),
+                             grow_after=0 if content_length else INGEST_MAX_SECTIONS // 4)
+        slides = await summarize_document(chunks, title, num_slides, admitted_model())
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Overloaded as e:
+        raise too_busy(e)
+    except Exception as e:
+        logger.error(f"Error in ingest_document: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    if not slides:
+        raise HTTPException(status_code=400, detail="Document is empty")
+
+    key = outline_id(title, num_slides, f"document:{digest.hexdigest()}", GEMINI_MODEL)
+    outline_cache.put(key, slides)
+    return {"slides": slides, "image_style": image_style, "outline_id": key}
+
+@app.post("/api/jobs", response_model=dict, status_code=202)
+async def submit_presentation_job(request: PresentationRequest):
+    """
+    Queue a presentation build and return its job id right away.
+    """
+    validate_request(request)
+    job = job_manager.submit(lambda job: build_presentation_job(request, job))
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}", response_model=dict)
+async def get_presentation_job(job_id: str):
+    """
+    Report the status, current stage and slide progress of a job.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/download")
+async def download_presentation_job(job_id: str):
+    """
+    Serve the finished presentation of a job.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=f"Job failed: {job.error}")
+    if job.status != "done" or not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=409, detail=f"Job is not finished yet (status: {job.status})")
+
+    return FileResponse(
+        path=job.file_path,
+        filename=os.path.basename(job.file_path),
+        media_type=PPTX_MEDIA_TYPE
+    )
+
+def apply_slide_edit(deck_id: str, slide_index: int, edit: SlideEditRequest) -> Tuple[Dict, bytes]:
+    """Re-renders one slide of a saved deck and saves the result. Returns (state, pptx bytes)."""
+    with deck_store.lock(deck_id):
+        saved = deck_store.get(deck_id)
+        if not saved:
+            raise HTTPException(status_code=404, detail="Deck not found or expired")
+        state, pptx_bytes = saved
+        if not 0 <= slide_index < len(state["layout"]):
+            raise HTTPException(status_code=404, detail="Slide not found")
+        if state["layout"][slide_index].get("slide_id") is None:
+            raise HTTPException(status_code=409, detail="Slide is not part of the saved deck")
+
+        slide_data = dict(state["slides"][slide_index])
+        if edit.title is not None:
+            slide_data["title"] = edit.title.strip()
+        if edit.regenerate_text:
+            with span("outline"):
+                slide_data.update(regenerate_slide_text(state["title"], slide_data["title"]))
+        elif edit.content is not None:
+            slide_data["content"] = [bullet for bullet in edit.content if bullet.strip()]
+        if not slide_data["title"] or not slide_data["content"]:
+            raise HTTPException(status_code=400, detail="Slide title and content cannot be empty")
+
+        stats = {}
+        try:
+            new_bytes = edit_slide(pptx_bytes, state["layout"][slide_index], slide_data, state["image_style"],
+                                   refresh_image=edit.regenerate_image, stats=stats)
+        except KeyError:
+            raise HTTPException(status_code=409, detail="Slide is not part of the saved deck")
+        state["slides"][slide_index] = slide_data
+        deck_store.update(deck_id, state, new_bytes)
+        logger.info(f"Deck {deck_id}: slide {slide_index} edited, {stats.get('deck_bytes', 0)} bytes")
+        return state, new_bytes
+
+@app.post("/api/decks/{deck_id}/slides/{slide_index}")
+async def edit_deck_slide(deck_id: str, slide_index: int, edit: SlideEditRequest):
+    """
+    Change the text and/or image of one slide of a generated deck and return the updated deck.
+    Only that slide is re-rendered; the rest of the saved deck is reused as is.
+    """
+    try:
+        state, pptx_bytes = await run_in_threadpool(apply_slide_edit, deck_id, slide_index, edit)
+    except HTTPException as e:
+        raise e
+    except Overloaded as e:
+        raise too_busy(e)
+    except Exception as e:
+        logger.error(f"Error in edit_deck_slide: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    headers = attachment_headers(f"{sanitize_filename(state['title'].strip())}.pptx")
+    headers["X-Deck-Id"] = deck_id
+    return Response(content=pptx_bytes, media_type=PPTX_MEDIA_TYPE, headers=headers)
+
+@app.get("/api/decks/{deck_id}", response_model=dict)
+async def get_deck(deck_id: str):
+    """
+    Return the saved state of a generated deck: its request fields, slides and layout.
+    """
+    state = deck_store.get_state(deck_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Deck not found or expired")
+    return state
+
+@app.get("/api/decks/{deck_id}/download")
+async def download_deck(deck_id: str):
+    """
+    Serve the current version of a saved deck.
+    """
+    state = deck_store.get_state(deck_id)
+    path = deck_store.path(deck_id)
+    if not state or not path:
+        raise HTTPException(status_code=404, detail="Deck not found or expired")
+    return FileResponse(path=path, filename=f"{sanitize_filename(state['title'].strip())}.pptx", media_type=PPTX_MEDIA_TYPE)
+
+def coalescing_stats() -> dict:
+    return {flight.name: flight.stats() for flight in (outline_flight, image_flight, deck_flight)}
+
+@app.get("/api/cache_stats", response_model=dict)
+async def cache_stats():
+    """
+    Report hit/miss/eviction counters for the server-side caches.
+    """
+    return {"images": image_cache.stats(), "derived": derived_cache.stats(), "outlines": outline_cache.stats(),
+            "image_worker": image_worker.stats(), "decks": deck_store.stats(), "coalescing": coalescing_stats(),
+            "admission": {"gemini": llm_admission.stats(), "image_worker": image_admission.stats()},
+            "hedging": llm_hedge.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Prometheus-style metrics: stage latency histograms, in-flight and error counts, cache stats.
+    """
+    cache_stats = render_stats("deck_cache", "cache", {"images": image_cache.stats(), "derived": derived_cache.stats(),
+                                                       "outlines": outline_cache.stats(), "decks": deck_store.stats()})
+    worker_stats = render_stats("image_worker", "worker", {"default": image_worker.stats()})
+    flight_stats = render_stats("singleflight", "stage", coalescing_stats())
+    return PlainTextResponse(registry.render() + cache_stats + worker_stats + flight_stats, media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
+    import uvicorn
     port = int(os.environ.get("PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port, log_level="debug", reload=True)
@@ -0,0 +1,259 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+trace_logger = logging.getLogger("deck.trace")
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, List] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, series):
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {bucket_count}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Holds metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+STAGE_SECONDS = registry.histogram("deck_stage_duration_seconds", "Time spent in each generation stage.", ["stage"])
+STAGE_ERRORS = registry.counter("deck_stage_errors_total", "Failures per generation stage.", ["stage"])
+REQUEST_SECONDS = registry.histogram("http_request_duration_seconds", "API request latency.", ["endpoint", "status"])
+REQUESTS_IN_FLIGHT = registry.gauge("http_requests_in_flight", "API requests currently being served.", ["endpoint"])
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("deck_trace", default=None)
+
+
+class _Span:
+    __slots__ = ("stage", "detail", "start")
+
+    def __init__(self, stage: str, detail: Optional[str]):
+        self.stage = stage
+        self.detail = detail
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        trace = _current_trace.get()
+        if trace is not None:
+            entry = {"stage": self.stage, "seconds": round(elapsed, 4)}
+            if self.detail:
+                entry["detail"] = self.detail
+            if exc_type is not None:
+                entry["error"] = True
+            trace.append(entry)
+        return False
+
+
+_NOOP = nullcontext()
+
+
+def span(stage: str, detail: Optional[str] = None):
+    """
+    Times a block as one stage. The duration goes into the stage histogram and,
+    inside a traced request, into that request's breakdown. A no-op when disabled.
+    """
+    if not METRICS_ENABLED:
+        return _NOOP
+    return _Span(stage, detail)
+
+
+def record_error(stage: str) -> None:
+    """Counts a failure for a stage that handles its own errors."""
+    if METRICS_ENABLED:
+        STAGE_ERRORS.inc(stage=stage)
+
+
+class trace_request:
+    """
+    Collects the spans of one request (or background job) and logs them as a
+    single structured line when it finishes. Also tracks in-flight requests.
+
+    With `defer=True` a block that exits cleanly leaves the trace open, for a
+    response whose body is still to be sent; pass the body through `finish_after`
+    to close it once the last chunk has gone out.
+    """
+
+    def __init__(self, endpoint: str, defer: bool = False):
+        self.endpoint = endpoint
+        self.status = "ok"
+        self.defer = defer
+        self._token = None
+        self._open = False
+
+    def __enter__(self):
+        if METRICS_ENABLED:
+            self.start = time.perf_counter()
+            self.stages: List[Dict] = []
+            self._token = _current_trace.set(self.stages)
+            self._open = True
+            REQUESTS_IN_FLIGHT.inc(endpoint=self.endpoint)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._token is None:
+            return False
+        _current_trace.reset(self._token)
+        if exc_type is not None or not self.defer:
+            self.finish(exc_type is not None)
+        return False
+
+    async def finish_after(self, body: AsyncIterator):
+        """Passes a response body through and finishes the trace when it is done or fails."""
+        failed = True
+        try:
+            async for chunk in body:
+                yield chunk
+            failed = False
+        finally:
+            self.finish(failed)
+
+    def finish(self, failed: bool = False) -> None:
+        """Records the request's duration and logs its trace; later calls do nothing."""
+        if not self._open:
+            return
+        self._open = False
+        REQUESTS_IN_FLIGHT.dec(endpoint=self.endpoint)
+        if failed:
+            self.status = "error"
+        elapsed = time.perf_counter() - self.start
+        REQUEST_SECONDS.observe(elapsed, endpoint=self.endpoint, status=self.status)
+        if self.stages:
+            trace_logger.info(json.dumps({
+                "event": "request_trace",
+                "endpoint": self.endpoint,
+                "status": self.status,
+                "seconds": round(elapsed, 4),
+                "stages": self.stages,
+            }))
+
+
+def render_stats(name: str, label: str, stats_by_source: Dict[str, Dict]) -> str:
+    """
+    Renders numeric stats dicts (e.g. cache counters) as gauges named `<name>_<key>`,
+    one series per source, labelled `<label>="<source>"`.
+    """
+    series: Dict[str, List[str]] = {}
+    for source, stats in stats_by_source.items():
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            series.setdefault(key, []).append(f'{name}_{key}{{{label}="{source}"}} {value}')
+
+    lines = []
+    for key, samples in series.items():
+        lines.append(f"# TYPE {name}_{key} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n" if lines else ""
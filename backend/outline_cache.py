@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+OUTLINE_CACHE_TTL_SECONDS = int(os.getenv("OUTLINE_CACHE_TTL_SECONDS", "1800"))
+OUTLINE_CACHE_MAX_ENTRIES = int(os.getenv("OUTLINE_CACHE_MAX_ENTRIES", "512"))
+
+
+def outline_id(title: str, num_slides: int, description: Optional[str], model: str) -> str:
+    """Returns a stable id for an outline request, ignoring case and extra whitespace."""
+    def normalize(text: Optional[str]) -> str:
+        return " ".join((text or "").split()).lower()
+
+    payload = json.dumps([normalize(title), int(num_slides), normalize(description), model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class OutlineCache:
+    """
+    In-memory LRU cache of generated slide outlines with a TTL.
+
+    Preview stores the outline under its id; generate can then fetch it by id
+    (or by recomputing the id from the same request) instead of calling the model again.
+    """
+
+    def __init__(self, ttl: int = OUTLINE_CACHE_TTL_SECONDS, max_entries: int = OUTLINE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Returns the cached outline for an id, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, slides = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return slides
+
+    def put(self, key: str, slides: List[Dict]) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + self.ttl, slides)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,70 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class OutlineParser:
+    """
+    Incremental parser for the "Slide N / title / - bullet / @" outline format.
+
+    Feed it text chunks as the model produces them; each call returns the slides
+    that became complete (a slide is complete once the next "Slide " line starts).
+    Call close() at the end of the stream to flush the last slide.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._current: Optional[Dict] = None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        completed = []
+        for line in lines:
+            slide = self._parse_line(line)
+            if slide is not None:
+                completed.append(slide)
+        return completed
+
+    def close(self) -> List[Dict]:
+        completed = []
+        if self._buffer:
+            slide = self._parse_line(self._buffer)
+            self._buffer = ""
+            if slide is not None:
+                completed.append(slide)
+        if self._current and self._current["title"]:
+            completed.append(self._current)
+        self._current = None
+        return completed
+
+    def _parse_line(self, line: str) -> Optional[Dict]:
+        """Applies one line; returns the previous slide if this line started a new one."""
+        line = line.strip()
+        if not line:
+            return None
+        if line.startswith("Slide "):
+            finished = self._current
+            self._current = {"title": "", "content": []}
+            return finished
+        if line == "@":
+            return None
+        if self._current and not self._current["title"]:
+            self._current["title"] = line
+        elif self._current:
+            if line.startswith("- "):  # Handle bullet points explicitly
+                self._current["content"].append(line[2:].strip())
+            elif self._current["content"]:  # Only add if after bullets started
+                self._current["content"][-1] += f" {line}"
+        return None
+
+
+def iter_outline(chunks: Iterable[str]) -> Iterator[Dict]:
+    """Yields slides from a stream of text chunks as soon as each one is complete."""
+    parser = OutlineParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+def parse_outline(text: str) -> List[Dict]:
+    """Parses a complete model response into slides."""
+    return list(iter_outline([text.strip()]))
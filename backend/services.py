@@ -1,16 +1,27 @@
 from pptx import Presentation
-from pptx.util import Inches, Pt
+from pptx.util import Emu, Inches, Pt
 from pptx.dml.color import RGBColor
 from pptx.enum.text import PP_ALIGN
-from pptx.enum.chart import XL_CHART_TYPE
-from pptx.chart.data import CategoryChartData
 from pptx.enum.shapes import MSO_SHAPE
+import contextvars
+import hashlib
+import io
 import os
-from typing import List, Dict
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional, Tuple
 from dotenv import load_dotenv
-import requests
-from PIL import Image
+from lxml import etree
 import re
+from image_cache import DERIVED_CACHE_DIR, DERIVED_CACHE_MAX_BYTES, ImageCache
+from template_registry import TemplateRegistry
+from image_processing import PreparedImage, prepare_slide_image
+from image_worker import ImageWorkerClient
+from metrics import record_error, span
+from singleflight import SingleFlight
+from admission import AdmissionController
+from text_fit import LINE_SPACING, fit_font_size
+from thumbnails import THUMBNAIL_WIDTH, ThumbnailPool, thumbnail_key
 
 load_dotenv()
 
@@ -18,6 +29,28 @@ TEMPLATE_DIR = "templates"
 IMAGE_DIR = "slide_images"
 os.makedirs(IMAGE_DIR, exist_ok=True)
 
+IMAGE_CONCURRENCY = int(os.getenv("IMAGE_CONCURRENCY", "6"))  # Max parallel image worker calls per deck
+IMAGE_BOX_INCHES = (5, 4)  # On-slide width and height of content images
+THANK_YOU_TITLE = "Thank You!"  # Closing slide; never an editable content slide
+TEXT_MARGIN_BOTTOM = Inches(0.2)
+TEXT_MARGIN_X, TEXT_MARGIN_TOP = Inches(0.1), Inches(0.05)  # python-pptx text box defaults
+TITLE_FONT_SIZE, TITLE_COLOR = Pt(36), RGBColor(0, 51, 102)
+BODY_FONT_SIZES = (Pt(20), Pt(12))  # Largest and smallest bullet size
+CHART_LABEL_MAX_POINTS = 20  # Charts with more points per series are drawn without data labels
+IMAGE_RATE_PER_SECOND = float(os.getenv("IMAGE_RATE_PER_SECOND", "10"))  # Image worker quota; 0 disables the limit
+IMAGE_BURST = float(os.getenv("IMAGE_BURST", "20"))
+
+image_cache = ImageCache()  # Worker images only, so its stats measure worker traffic saved
+derived_cache = ImageCache(cache_dir=DERIVED_CACHE_DIR, max_bytes=DERIVED_CACHE_MAX_BYTES)  # Resized variants, thumbnails
+image_worker = ImageWorkerClient()  # Pooled, retrying client; URL from IMAGE_WORKER_URL
+image_flight = SingleFlight("image")  # Decks being built at once share fetches of the same image
+image_admission = AdmissionController("image_worker", IMAGE_RATE_PER_SECOND, IMAGE_BURST)
+thumbnail_pool = ThumbnailPool()  # Preview thumbnails render in parallel worker processes
+
+# Parse-once template store; each deck gets its own copy
+template_registry = TemplateRegistry(TEMPLATE_DIR)
+template_registry.load_all()
+
 def sanitize_filename(filename: str) -> str:
     """Removes invalid characters from filenames."""
     return re.sub(r'[<>:"/\\|?*]', '_', filename)
@@ -30,54 +63,89 @@ def get_template_path(template_name: str) -> str:
     else:
         raise FileNotFoundError(f"❌ Template '{template_name}' not found!")
 
-def generate_slide_image(prompt: str, style: str) -> str:
+def generate_slide_image(prompt: str, style: str, refresh: bool = False) -> str:
     """
     Generates an image using the Cloudflare Worker API with the given style.
+    Images already in the cache are returned without calling the worker, unless refresh is set.
     """
     try:
-        WORKER_URL = "https://image-generator.worldforscience.workers.dev/"
-        response = requests.post(WORKER_URL, json={"prompt": prompt, "style": style})
-        
-        if response.status_code == 200:
-            image_data = response.content
-            image_path = os.path.join(IMAGE_DIR, f"{sanitize_filename(prompt)}_{style}.png")
+        cached_path = None if refresh else image_cache.get(prompt, style)
+        if cached_path:
+            return cached_path
+
+        if image_worker.breaker.is_open():
+            return None  # Text-only right away instead of queueing for a token the worker would refuse
+        image_admission.acquire()
+        image_data = image_worker.generate(prompt, style)
+        if image_data:
+            return image_cache.put(prompt, style, image_data)
+        return None
 
-            with open(image_path, "wb") as img_file:
-                img_file.write(image_data)
+    except Exception as e:
+        print(f"❌ Error generating image with Cloudflare Worker: {e}")
+        return None
+
+def fetch_slide_image(prompt: str, style: str, refresh: bool = False) -> Optional[PreparedImage]:
+    """
+    Generates (or loads from cache) a slide image and downsizes it for embedding.
+    Concurrent fetches of the same image share one worker call and resize.
+    """
+    return image_flight.do((prompt, style, refresh), _fetch_slide_image, prompt, style, refresh)
 
-            return image_path
-        else:
-            print(f"❌ Error: {response.status_code} - {response.text}")
-            return None
+def _fetch_slide_image(prompt: str, style: str, refresh: bool) -> Optional[PreparedImage]:
+    with span("image", prompt):
+        image_path = generate_slide_image(prompt, style, refresh)
+    if not image_path:
+        record_error("image")
+        return None
+    with span("image_resize", prompt):
+        return prepare_slide_image(image_path, *IMAGE_BOX_INCHES, derived_cache)
 
+def prefetch_slide_images(prompts: List[str], style: str, max_workers: Optional[int] = None) -> List[Future]:
+    """
+    Starts image generation for every prompt at once (bounded by max_workers)
+    and returns one future per prompt, in the same order.
+    """
+    workers = max(1, min(max_workers or IMAGE_CONCURRENCY, len(prompts) or 1))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slide-image")
+    # Each task runs in a copy of the caller's context so its spans land in the request's trace
+    futures = [executor.submit(contextvars.copy_context().run, fetch_slide_image, prompt, style) for prompt in prompts]
+    executor.shutdown(wait=False)  # Queued prompts still run; the pool winds down once they finish
+    return futures
+
+def wait_for_image(future: Future) -> Optional[PreparedImage]:
+    """Returns the prepared image from a prefetch future, or None if generation failed."""
+    try:
+        return future.result()
     except Exception as e:
-        print(f"❌ Error generating image with Cloudflare Worker: {e}")
+        print(f"❌ Error generating image: {e}")
         return None
 
-def adjust_font_size(text_frame, max_lines=8, max_font_size=Pt(20), min_font_size=Pt(12)):
+def fit_text_size(text_frame, paragraphs: List[str], width, height, max_font_size=Pt(20), min_font_size=Pt(12)) -> Pt:
     """
-    Dynamically adjusts font size to fit content within the text box.
+    Picks the largest font size at which the paragraphs, wrapped to the text box width
+    (inside its margins), fit the box height. Uses measured glyph widths, not line counts.
     """
-    while text_frame.text and len(text_frame.text.split("\n")) > max_lines and max_font_size > min_font_size:
-        max_font_size -= Pt(2)
-        for paragraph in text_frame.paragraphs:
-            paragraph.font.size = max_font_size
+    inner_width = Emu(width - text_frame.margin_left - text_frame.margin_right).pt
+    inner_height = Emu(height - text_frame.margin_top - text_frame.margin_bottom).pt
+    return Pt(fit_font_size(paragraphs, inner_width, inner_height, int(max_font_size.pt), int(min_font_size.pt)))
 
-def add_chart_to_slide(slide, chart_data: Dict[str, List[float]], chart_type: str = "bar") -> None:
+def add_chart_to_slide(slide, chart_data: Dict, chart_type: Optional[str] = None) -> None:
     """
-    Adds a chart (bar, pie, etc.) to the slide based on the provided data.
+    Adds a chart (bar, line, pie, scatter, etc.) to the slide. Accepts lists, NumPy arrays or
+    columnar data with any number of series; large inputs are downsampled first (see charts.prepare_chart).
     """
-    chart_data_obj = CategoryChartData()
-    chart_data_obj.categories = chart_data["categories"]
-    chart_data_obj.add_series('Series 1', chart_data["values"])
+    from charts import prepare_chart  # Imports NumPy; loaded on the first chart so startup skips it
+
+    with span("chart"):
+        prepared = prepare_chart(chart_data, chart_type)
 
     x, y, cx, cy = Inches(0.5), Inches(1.5), Inches(5), Inches(3)  # Position and size of the chart
-    chart = slide.shapes.add_chart(
-        XL_CHART_TYPE.BAR_CLUSTERED, x, y, cx, cy, chart_data_obj
-    ).chart
+    chart = slide.shapes.add_chart(prepared.chart_type, x, y, cx, cy, prepared.data).chart
 
     chart.has_legend = True
-    chart.plots[0].has_data_labels = True
+    if prepared.points <= CHART_LABEL_MAX_POINTS:  # Labels on dense charts are unreadable
+        chart.plots[0].has_data_labels = True
 
 def add_shape_to_slide(slide, shape_type: str, left: Inches, top: Inches, width: Inches, height: Inches) -> None:
     """
@@ -92,11 +160,208 @@ def add_shape_to_slide(slide, shape_type: str, left: Inches, top: Inches, width:
             MSO_SHAPE.ELLIPSE, left, top, width, height
         )
 
-def generate_pptx(request, ppt_content: List[Dict[str, List[str]]], image_style: str = "realistic", template_name: str = None) -> str:
+def set_slide_title(slide, title: str) -> None:
+    """Sets a content slide's title in the deck's heading style."""
+    if slide.shapes.title:
+        slide.shapes.title.text = title.strip()
+        slide.shapes.title.text_frame.paragraphs[0].font.size = TITLE_FONT_SIZE
+        slide.shapes.title.text_frame.paragraphs[0].font.bold = True
+        slide.shapes.title.text_frame.paragraphs[0].font.color.rgb = TITLE_COLOR
+
+def slide_body_boxes(has_image: bool, image_left: bool) -> Tuple[Optional[Tuple], Tuple]:
+    """
+    Returns (image box or None, text box) for a content slide, each as (left, top, width, height) in EMU.
+    The image goes on the left or right as given; without one the text spans the slide.
+    """
+    if has_image:
+        image_box = (Inches(0.5) if image_left else Inches(7.5), Inches(1.5), Inches(IMAGE_BOX_INCHES[0]), Inches(IMAGE_BOX_INCHES[1]))
+        return image_box, (Inches(7.5) if image_left else Inches(0.5), Inches(1.5), Inches(5.5), Inches(5))
+    return None, (Inches(1), Inches(1.5), Inches(10), Inches(5))
+
+def fill_slide_body(slide, slide_data: Dict, prepared: Optional[PreparedImage], image_left: bool) -> None:
+    """
+    Adds a content slide's image, bullet text box, chart and shapes. The image goes on
+    the left or right as given; without one the text spans the slide.
+    """
+    image_box, (text_left, text_top, text_width, text_height) = slide_body_boxes(bool(prepared), image_left)
+
+    if prepared:
+        img_left, img_top, img_width, img_height = image_box
+        slide.shapes.add_picture(prepared.path, img_left, img_top, width=img_width, height=img_height)
+
+    # Text Box for Content
+    content_box = slide.shapes.add_textbox(text_left, text_top, text_width, text_height)
+    text_frame = content_box.text_frame
+    text_frame.word_wrap = True
+    text_frame.margin_bottom = TEXT_MARGIN_BOTTOM
+
+    # Size the bullets once so the wrapped text fits the box
+    bullets = [bullet.strip() for bullet in slide_data["content"]]
+    with span("fit_text"):
+        font_size = fit_text_size(text_frame, [""] + bullets, text_width, text_height, *BODY_FONT_SIZES)  # "" is the frame's leading empty paragraph
+
+    # Add Text Bullets
+    for bullet in bullets:
+        p = text_frame.add_paragraph()
+        p.text = bullet
+        p.font.size = font_size
+        p.font.color.rgb = RGBColor(0, 0, 0)
+        p.level = 0
+
+    # Add chart if specified in slide_data
+    if "chart" in slide_data:
+        add_chart_to_slide(slide, slide_data["chart"])
+
+    # Add shapes if specified in slide_data
+    if "shapes" in slide_data:
+        for shape in slide_data["shapes"]:
+            add_shape_to_slide(slide, shape["type"], Inches(shape["left"]), Inches(shape["top"]), Inches(shape["width"]), Inches(shape["height"]))
+
+def clear_slide_body(slide) -> None:
+    """
+    Removes everything but the title from a slide, along with the relationships
+    (images, charts) only those shapes used, so replaced media is not left in the package.
+    """
+    title = slide.shapes.title
+    for shape in list(slide.shapes):
+        if title is not None and shape.shape_id == title.shape_id:
+            continue
+        element = shape.element
+        rIds = element.xpath(".//@r:embed | .//@r:id | .//@r:link")
+        element.getparent().remove(element)
+        for rId in set(rIds):
+            if rId in slide.part.rels:
+                slide.part.drop_rel(rId)
+
+def _theme_color(master, name: str) -> Optional[str]:
+    """Resolves a scheme colour name (e.g. "bg1") to hex through the master's colour map and theme."""
+    name = (master._element.xpath("./p:clrMap/@" + name) or [name])[0]
+    for rel in master.part.rels.values():
+        if rel.reltype.endswith("/theme"):
+            theme = etree.fromstring(rel.target_part.blob)
+            ns = {"a": "http://schemas.openxmlformats.org/drawingml/2006/main"}
+            values = theme.xpath(f".//a:clrScheme/a:{name}/a:srgbClr/@val | .//a:clrScheme/a:{name}/a:sysClr/@lastClr", namespaces=ns)
+            return f"#{values[0]}" if values else None
+    return None
+
+def _background(layout) -> Tuple[str, Optional[object]]:
+    """Returns (colour, picture part or None) of the background content slides inherit from their layout."""
+    for source in (layout, layout.slide_master):
+        bg = source._element.xpath("./p:cSld/p:bg")
+        if not bg:
+            continue
+        rgb = bg[0].xpath(".//a:srgbClr/@val")
+        if rgb:
+            return f"#{rgb[0]}", None
+        blip = bg[0].xpath(".//a:blip/@r:embed")
+        if blip:
+            return "#FFFFFF", source.part.related_part(blip[0])
+        scheme = bg[0].xpath(".//a:schemeClr/@val")
+        if scheme:
+            return _theme_color(layout.slide_master, scheme[0]) or "#FFFFFF", None
+    return "#FFFFFF", None
+
+@lru_cache(maxsize=32)
+def _template_style(template_name: str, mtime: float) -> Dict:
+    prs = template_registry.open(template_name)
+    layout = prs.slide_layouts[1] if len(prs.slide_layouts) > 1 else prs.slide_layouts[0]  # Same content layout as the deck
+    title = next((ph for ph in layout.placeholders if ph.placeholder_format.idx == 0), None)
+    title_box = (title.left, title.top, title.width, title.height) if title is not None else (Inches(0.5), Inches(0.3), Inches(12), Inches(1))
+    color, picture = _background(layout)
+    # The picture's bytes, not a path: the file lives in derived_cache, which may evict it
+    background_picture = (hashlib.sha256(picture.blob).hexdigest(), picture.blob, picture.ext) if picture else None
+    align = (layout.slide_master._element.xpath("./p:txStyles/p:titleStyle/a:lvl1pPr/@algn") or ["l"])[0]
+    return {"size": (prs.slide_width, prs.slide_height), "background": color, "background_picture": background_picture,
+            "title_box": title_box, "title_align": align}
+
+def template_style(template_name: str) -> Dict:
+    """What thumbnails need from a template: slide size, background and title placement (in EMU)."""
+    style = dict(_template_style(template_name, os.path.getmtime(get_template_path(template_name))))
+    picture_path = None
+    if style["background_picture"]:
+        key, blob, ext = style["background_picture"]
+        picture_path = derived_cache.get_key(key) or derived_cache.put_key(key, blob, ext)
+    style["background_image"] = picture_path
+    return style
+
+def thumbnail_spec(style: Dict, slide_data: Dict, image_path: Optional[str], image_left: bool, width: int) -> Dict:
+    """
+    Lays out one content slide in thumbnail pixels with the same boxes and font sizes
+    a full build uses (see fill_slide_body), for thumbnails.render_thumbnail.
+    """
+    slide_width, slide_height = style["size"]
+    scale = width / slide_width
+    def px(box):
+        return [round(v * scale) for v in box]
+
+    image_box, (text_left, text_top, text_width, text_height) = slide_body_boxes(bool(image_path), image_left)
+    inner = (text_left + TEXT_MARGIN_X, text_top + TEXT_MARGIN_TOP,
+             text_width - 2 * TEXT_MARGIN_X, text_height - TEXT_MARGIN_TOP - TEXT_MARGIN_BOTTOM)
+    paragraphs = [""] + [bullet.strip() for bullet in slide_data["content"]]  # "" is the frame's leading empty paragraph
+    font_size = fit_font_size(paragraphs, Emu(inner[2]).pt, Emu(inner[3]).pt, int(BODY_FONT_SIZES[0].pt), int(BODY_FONT_SIZES[1].pt))
+
+    return {
+        "size": [width, round(slide_height * scale)],
+        "background": style["background"],
+        "background_image": style["background_image"],
+        "line_spacing": LINE_SPACING,
+        "title": {"text": slide_data["title"].strip(), "box": px(style["title_box"]), "font_px": round(TITLE_FONT_SIZE * scale),
+                  "color": f"#{TITLE_COLOR}", "align": style["title_align"]},
+        "image": {"path": image_path, "box": px(image_box)} if image_path else None,
+        "body": {"paragraphs": paragraphs, "box": px(inner), "font_px": round(Pt(font_size) * scale), "color": "#000000"},
+    }
+
+def render_slide_thumbnails(slides: List[Dict], template_name: str, image_style: str = "realistic", width: Optional[int] = None) -> List[str]:
+    """
+    Renders approximate thumbnails of the content slides and returns their cache keys
+    (see thumbnail_path). Only images already in the cache are drawn; the worker is
+    never called. Thumbnails are cached by content hash and only misses are rendered,
+    in parallel on the thumbnail pool.
+    """
+    style = template_style(template_name)
+    specs, left_side = [], True
+    for slide_data in slides:
+        image_path = image_cache.peek(slide_data["title"], image_style)
+        specs.append(thumbnail_spec(style, slide_data, image_path, left_side, width or THUMBNAIL_WIDTH))
+        if image_path:
+            left_side = not left_side  # Same alternation as build_presentation
+
+    keys = [thumbnail_key(spec) for spec in specs]
+    missing = {key: spec for key, spec in zip(keys, specs) if not derived_cache.get_key(key)}
+    if missing:
+        with span("thumbnails", f"{len(missing)} slides"):
+            for key, data in zip(missing, thumbnail_pool.render(list(missing.values()))):
+                derived_cache.put_key(key, data, "jpg")
+    return keys
+
+def thumbnail_path(key: str) -> Optional[str]:
+    """Path of a rendered thumbnail, or None if it is unknown or was evicted."""
+    return derived_cache.get_key(key)
+
+def deck_file_name(request) -> str:
+    """Returns the download name for a request's deck."""
+    return f"{sanitize_filename(request.title.strip())}.pptx"
+
+def build_presentation(request, ppt_content: List[Dict[str, List[str]]], image_style: str = "realistic", template_name: str = None, image_concurrency: Optional[int] = None,
+                       progress: Optional[Callable[[str, int, int], None]] = None, stats: Optional[Dict] = None,
+                       layout: Optional[List[Dict]] = None):
+    """
+    Builds the deck in memory and returns the Presentation without saving it.
+    progress, if given, is called as progress(stage, slides_done, slides_total).
+    stats, if given, is filled with image byte counts for the deck.
+    layout, if given, gets one entry per content slide (slide_id, image_left, image_prompt)
+    so single slides can be edited later with edit_slide.
+    """
+    image_futures = []
+    slide_layout_entries = []
+    original_image_bytes = 0
+    embedded_images = {}  # digest -> bytes; the package stores identical images once
+    report = progress or (lambda stage, done=0, total=0: None)
     try:
+        report("template")
         # Load selected template
-        template_path = get_template_path(template_name or request.template)
-        prs = Presentation(template_path)
+        with span("template"):
+            prs = template_registry.open(template_name or request.template)
 
         # Ensure template has at least 2 slides (Title + Thank You)
         if len(prs.slides) < 2:
@@ -116,80 +381,142 @@ def generate_pptx(request, ppt_content: List[Dict[str, List[str]]], image_style:
         available_slides = min(len(ppt_content), request.num_slides)
         left_side = True  # Toggle image placement
 
+        report("images", 0, available_slides)
+
+        # Kick off every slide image up front so the deck waits on the slowest image, not the sum
+        image_futures = prefetch_slide_images(
+            [slide_data["title"] for slide_data in ppt_content[:available_slides]], image_style, image_concurrency
+        )
+
         for i, slide_data in enumerate(ppt_content[:available_slides]):
             slide_layout = prs.slide_layouts[1] if len(prs.slide_layouts) > 1 else prs.slide_layouts[0]  # Use a content layout
             slide = prs.slides.add_slide(slide_layout)  
 
-            # Set Slide Title
-            if slide.shapes.title:
-                slide.shapes.title.text = slide_data["title"].strip()
-                slide.shapes.title.text_frame.paragraphs[0].font.size = Pt(36)
-                slide.shapes.title.text_frame.paragraphs[0].font.bold = True
-                slide.shapes.title.text_frame.paragraphs[0].font.color.rgb = RGBColor(0, 51, 102)
-
-            # Generate Image
-            image_path = generate_slide_image(slide_data["title"], image_style)
-            img_width, img_height = Inches(5), Inches(4)
-
-            if image_path:
-                img_left = Inches(0.5) if left_side else Inches(7.5)
-                text_left = Inches(7.5) if left_side else Inches(0.5)
+            # Wait for this slide's prefetched image
+            with span("image_wait"):
+                prepared = wait_for_image(image_futures[i])
+            if prepared:
+                original_image_bytes += prepared.original_bytes
+                embedded_images[prepared.digest] = prepared.embedded_bytes
+
+            set_slide_title(slide, slide_data["title"])
+            fill_slide_body(slide, slide_data, prepared, left_side)
+            slide_layout_entries.append({"slide_id": slide.slide_id, "image_left": left_side, "image_prompt": slide_data["title"]})
+            if prepared:
                 left_side = not left_side  # Toggle for next slide
 
-                slide.shapes.add_picture(image_path, img_left, Inches(1.5), width=img_width, height=img_height)
-                text_width = Inches(5.5)
-            else:
-                text_left = Inches(1)
-                text_width = Inches(10)
-
-            # Text Box for Content
-            text_top, text_height = Inches(1.5), Inches(5)
-            content_box = slide.shapes.add_textbox(text_left, text_top, text_width, text_height)
-            text_frame = content_box.text_frame
-            text_frame.word_wrap = True
-            text_frame.margin_bottom = Inches(0.2)
-
-            # Add Text Bullets
-            font_size = Pt(20)
-            for bullet in slide_data["content"]:
-                p = text_frame.add_paragraph()
-                p.text = bullet.strip()
-                p.font.size = font_size
-                p.font.color.rgb = RGBColor(0, 0, 0)
-                p.level = 0
-
-            # Adjust font size if text overflows
-            adjust_font_size(text_frame)
-
-            # Add chart if specified in slide_data
-            if "chart" in slide_data:
-                add_chart_to_slide(slide, slide_data["chart"])
-
-            # Add shapes if specified in slide_data
-            if "shapes" in slide_data:
-                for shape in slide_data["shapes"]:
-                    add_shape_to_slide(slide, shape["type"], Inches(shape["left"]), Inches(shape["top"]), Inches(shape["width"]), Inches(shape["height"]))
+            report("slides", i + 1, available_slides)
 
         # Remove the last slide ("Thank You") and add it at the end
         thank_you_slide = prs.slides[-1]  # Assuming the last slide is "Thank You"
+        dropped_slide_id = thank_you_slide.slide_id  # The re-added slide can get this id back, so record it now
         prs.slides._sldIdLst.remove(prs.slides._sldIdLst[-1])  # Remove "Thank You" slide
 
         # Add "Thank You" slide at the end
         thank_you_layout = prs.slide_layouts[5]  # Title slide layout for "Thank You"
         slide = prs.slides.add_slide(thank_you_layout)
-        slide.shapes.title.text = "Thank You!"
+        slide.shapes.title.text = THANK_YOU_TITLE
         slide.shapes.title.text_frame.paragraphs[0].font.size = Pt(44)
         slide.shapes.title.text_frame.paragraphs[0].font.bold = True
         slide.shapes.title.text_frame.paragraphs[0].font.color.rgb = RGBColor(255, 255, 255)
         slide.shapes.title.text_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
 
-        # Save Presentation
-        file_name = f"{sanitize_filename(request.title.strip())}.pptx"
-        file_path = os.path.join(os.getcwd(), file_name)
-        prs.save(file_path)
-        return file_path
+        if layout is not None:
+            # Only slides still in the deck can be edited later
+            layout.extend(dict(entry, slide_id=None) if entry["slide_id"] == dropped_slide_id else entry
+                          for entry in slide_layout_entries)
+
+        if stats is not None:
+            embedded_bytes = sum(embedded_images.values())
+            stats.update({
+                "images": len(embedded_images),
+                "image_original_bytes": original_image_bytes,
+                "image_embedded_bytes": embedded_bytes,
+                "image_bytes_saved": original_image_bytes - embedded_bytes,
+            })
+
+        return prs
+
+    except Exception as e:
+        for future in image_futures:
+            future.cancel()
+        raise Exception(f"❌ Failed to generate presentation: {str(e)}")
+
+def generate_pptx(request, ppt_content: List[Dict[str, List[str]]], image_style: str = "realistic", template_name: str = None, image_concurrency: Optional[int] = None,
+                  output_dir: Optional[str] = None, progress: Optional[Callable[[str, int, int], None]] = None, stats: Optional[Dict] = None,
+                  layout: Optional[List[Dict]] = None) -> str:
+    """
+    Builds the deck and saves it to output_dir (the working directory by default).
+    """
+    prs = build_presentation(request, ppt_content, image_style, template_name, image_concurrency, progress, stats, layout)
 
+    # Save Presentation
+    if progress:
+        progress("saving", 0, 0)
+    file_path = os.path.join(output_dir or os.getcwd(), deck_file_name(request))
+    try:
+        with span("save"):
+            prs.save(file_path)
     except PermissionError:
         raise OSError(f"❌ Permission denied when saving file to {file_path}")
     except Exception as e:
         raise Exception(f"❌ Failed to generate presentation: {str(e)}")
+    if stats is not None:
+        stats["deck_bytes"] = os.path.getsize(file_path)
+    return file_path
+
+def generate_pptx_bytes(request, ppt_content: List[Dict[str, List[str]]], image_style: str = "realistic", template_name: str = None, image_concurrency: Optional[int] = None,
+                        progress: Optional[Callable[[str, int, int], None]] = None, stats: Optional[Dict] = None,
+                        layout: Optional[List[Dict]] = None) -> bytes:
+    """
+    Builds the deck and returns the serialized .pptx bytes, without touching the disk.
+    """
+    prs = build_presentation(request, ppt_content, image_style, template_name, image_concurrency, progress, stats, layout)
+
+    if progress:
+        progress("saving", 0, 0)
+    buffer = io.BytesIO()
+    try:
+        with span("save"):
+            prs.save(buffer)
+    except Exception as e:
+        raise Exception(f"❌ Failed to generate presentation: {str(e)}")
+    if stats is not None:
+        stats["deck_bytes"] = buffer.tell()
+    return buffer.getvalue()
+
+def edit_slide(pptx_bytes: bytes, slide_layout: Dict, slide_data: Dict, image_style: str = "realistic",
+               refresh_image: bool = False, stats: Optional[Dict] = None) -> bytes:
+    """
+    Re-renders one content slide of a saved deck and returns the new .pptx bytes.
+
+    slide_layout is the slide's entry from build_presentation's layout. Only that
+    slide's title and body shapes are replaced; every other slide, the template and
+    the media they use are carried over from the saved package as they are.
+    The image is looked up by the slide title like in a full build, so an unchanged
+    title reuses the cached image unless refresh_image is set. slide_layout's
+    image_prompt is updated in place.
+    """
+    try:
+        with span("deck_load"):
+            prs = Presentation(io.BytesIO(pptx_bytes))
+        slide = prs.slides.get(slide_layout["slide_id"]) if slide_layout.get("slide_id") else None
+        if slide is None or (slide.shapes.title is not None and slide.shapes.title.text == THANK_YOU_TITLE):
+            raise KeyError("Slide is not in the saved deck")
+
+        prepared = fetch_slide_image(slide_data["title"], image_style, refresh_image)
+        set_slide_title(slide, slide_data["title"])
+        clear_slide_body(slide)
+        fill_slide_body(slide, slide_data, prepared, slide_layout.get("image_left", True))
+        slide_layout["image_prompt"] = slide_data["title"]
+
+        buffer = io.BytesIO()
+        with span("save"):
+            prs.save(buffer)
+    except KeyError:
+        raise
+    except Exception as e:
+        raise Exception(f"❌ Failed to edit slide: {str(e)}")
+    if stats is not None:
+        stats["deck_bytes"] = buffer.tell()
+    return buffer.getvalue()
@@ -0,0 +1,71 @@
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "1") != "0"
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight block until it finishes and get the same result (or exception). Nothing
+    is kept once the call completes, so this only dedupes work that overlaps in time;
+    caches handle repeats. `calls` counts executions and `coalesced` counts the
+    callers that shared one instead of repeating the upstream work.
+    """
+
+    def __init__(self, name: str, enabled: bool = COALESCE_REQUESTS):
+        self.name = name
+        self.enabled = enabled
+        self.calls = 0
+        self.coalesced = 0
+        self._in_flight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.enabled:
+            with self._lock:
+                self.calls += 1
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._in_flight[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
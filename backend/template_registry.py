@@ -0,0 +1,73 @@
+import io
+import os
+import threading
+import zipfile
+from typing import Dict, Tuple
+
+from pptx import Presentation
+
+TEMPLATE_DIR = "templates"
+
+
+def _repack_stored(data: bytes) -> bytes:
+    """Rewrites a .pptx zip without compression so each per-request open skips inflating parts."""
+    out = io.BytesIO()
+    with zipfile.ZipFile(io.BytesIO(data)) as src, zipfile.ZipFile(out, "w", zipfile.ZIP_STORED) as dst:
+        for info in src.infolist():
+            dst.writestr(info.filename, src.read(info.filename))
+    return out.getvalue()
+
+
+class TemplateRegistry:
+    """
+    Keeps every template in `template_dir` in memory and hands out independent copies.
+
+    Templates are read once (at startup via `load_all`, or on first use) and kept as
+    uncompressed package bytes. `open` builds a fresh Presentation from those bytes, so
+    requests never touch the disk or share objects. A template whose file changed on
+    disk is reloaded on its next use.
+    """
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        self.template_dir = template_dir
+        self._templates: Dict[str, Tuple[float, bytes]] = {}  # name -> (mtime, package bytes)
+        self._lock = threading.Lock()
+
+    def _path(self, template_name: str) -> str:
+        return os.path.join(self.template_dir, f"{template_name}.pptx")
+
+    def load_all(self) -> None:
+        """Loads every .pptx file in the template directory."""
+        if not os.path.isdir(self.template_dir):
+            return
+        for file_name in sorted(os.listdir(self.template_dir)):
+            if file_name.endswith(".pptx"):
+                self._package_bytes(file_name[:-len(".pptx")])
+
+    def _package_bytes(self, template_name: str) -> bytes:
+        template_path = self._path(template_name)
+        try:
+            mtime = os.stat(template_path).st_mtime
+        except OSError:
+            with self._lock:
+                self._templates.pop(template_name, None)
+            raise FileNotFoundError(f"❌ Template '{template_name}' not found!")
+
+        with self._lock:
+            cached = self._templates.get(template_name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(template_path, "rb") as f:
+            data = _repack_stored(f.read())
+        with self._lock:
+            self._templates[template_name] = (mtime, data)
+        return data
+
+    def open(self, template_name: str):
+        """Returns a new, independent Presentation built from the named template."""
+        return Presentation(io.BytesIO(self._package_bytes(template_name)))
+
+    def names(self):
+        with self._lock:
+            return sorted(self._templates)
@@ -0,0 +1,41 @@
+import random
+
+from benchmarks.fake_gemini import FakeGeminiModel
+from outline_parser import OutlineParser, iter_outline, parse_outline
+
+SAMPLES = [
+    FakeGeminiModel().outline_text("Create a 7-slide PPT"),
+    "Slide 1\nIntro\n- a\ncontinued\n- b\n@\nSlide 2\n\nNo bullets\nloose line\n@\nSlide 3\n",
+    "  preamble\nSlide 1\nTitle\n- x\r\n- y\n@",
+]
+
+
+def test_parse_outline():
+    slides = parse_outline("Slide 1\nIntro\n- a\ncontinued\n- b\n@\nSlide 2\nNext\n- c\n@")
+    assert slides == [{"title": "Intro", "content": ["a continued", "b"]}, {"title": "Next", "content": ["c"]}]
+
+
+def test_chunked_parsing_matches_batch_parsing():
+    rng = random.Random(0)
+    for text in SAMPLES:
+        expected = parse_outline(text)
+        for _ in range(200):
+            cuts = sorted(rng.sample(range(1, len(text)), min(len(text) - 1, rng.randint(1, 30))))
+            chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+            assert list(iter_outline(chunks)) == expected, chunks
+
+
+def test_slides_are_emitted_as_soon_as_the_next_one_starts():
+    parser = OutlineParser()
+    assert parser.feed("Slide 1\nIntro\n- a\n") == []
+    assert parser.feed("Slide 2\n") == [{"title": "Intro", "content": ["a"]}]
+    assert parser.feed("Next\n- b") == []
+    assert parser.close() == [{"title": "Next", "content": ["b"]}]
+
+
+def test_streamed_model_output_matches_batch_output():
+    model = FakeGeminiModel(first_token_delay=0, chars_per_second=1e9, chunk_size=7)
+    prompt = 'Create a 5-slide PPT blueprint for "Streaming"'
+    streamed = list(iter_outline(chunk.text for chunk in model.generate_content(prompt, stream=True)))
+    assert streamed == parse_outline(model.generate_content(prompt).text)
+    assert len(streamed) == 5
@@ -0,0 +1,120 @@
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Sequence, Tuple
+
+from PIL import ImageFont
+
+# Font used to measure text. Templates use Calibri; Carlito is metric-compatible with it.
+TEXT_FIT_FONT = os.getenv("TEXT_FIT_FONT", "")
+FALLBACK_FONTS = ("calibri.ttf", "Carlito-Regular.ttf", "DejaVuSans.ttf")
+BOLD_FALLBACK_FONTS = ("calibrib.ttf", "Carlito-Bold.ttf", "DejaVuSans-Bold.ttf")
+REFERENCE_SIZE = 100  # Glyph advances are measured once at this size and scaled linearly
+LINE_SPACING = 1.2  # Line height as a multiple of the font size
+AVERAGE_ADVANCE = 0.5  # Em fraction per glyph when no font can be loaded
+
+
+def load_font(size: int, bold: bool = False, font_path: str = TEXT_FIT_FONT):
+    """
+    Returns the measuring font at `size` pixels: font_path if it loads, else the first
+    available fallback (bold faces first when asked), else Pillow's bundled font.
+    None if no font can be loaded at all.
+    """
+    candidates = ([font_path] if font_path else []) + list(BOLD_FALLBACK_FONTS if bold else ()) + list(FALLBACK_FONTS)
+    for candidate in candidates:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)  # Pillow's bundled FreeType font
+    except (TypeError, OSError):
+        return None
+
+
+class GlyphMetrics:
+    """
+    Per-glyph advance widths for one font, measured lazily and cached.
+
+    Widths are in em (fractions of the font size), so a string's width at any size is
+    `width_em(text) * size`. Kerning is ignored, which keeps wrapping slightly conservative.
+    """
+
+    def __init__(self, font_path: str = TEXT_FIT_FONT):
+        self._font = load_font(REFERENCE_SIZE, font_path=font_path)
+        self._advances: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def advance(self, char: str) -> float:
+        width = self._advances.get(char)
+        if width is None:
+            width = self._font.getlength(char) / REFERENCE_SIZE if self._font else AVERAGE_ADVANCE
+            with self._lock:
+                self._advances[char] = width
+        return width
+
+    def width_em(self, text: str) -> float:
+        return sum(self.advance(char) for char in text)
+
+
+_metrics = None
+
+
+def get_metrics() -> GlyphMetrics:
+    global _metrics
+    if _metrics is None:
+        _metrics = GlyphMetrics()
+    return _metrics
+
+
+@lru_cache(maxsize=8192)
+def _word_width_em(word: str) -> float:
+    return get_metrics().width_em(word)
+
+
+def wrapped_line_count(text: str, size: float, box_width: float) -> int:
+    """Number of lines `text` wraps to at `size` points in a box `box_width` points wide."""
+    if not text:
+        return 1
+    space = _word_width_em(" ") * size
+    lines, line_width = 1, 0.0
+    for word in text.split():
+        word_width = _word_width_em(word) * size
+        if line_width and line_width + space + word_width > box_width:
+            lines += 1
+            line_width = 0.0
+        if word_width > box_width:
+            # A word longer than the box breaks across lines by itself
+            extra = int(word_width // box_width)
+            lines += extra
+            word_width -= extra * box_width
+        line_width += (space if line_width else 0.0) + word_width
+    return lines
+
+
+def _fits(paragraphs: Tuple[str, ...], size: float, box_width: float, box_height: float) -> bool:
+    lines = sum(wrapped_line_count(text, size, box_width) for text in paragraphs)
+    return lines * size * LINE_SPACING <= box_height
+
+
+@lru_cache(maxsize=4096)
+def _fit_font_size(paragraphs: Tuple[str, ...], box_width: float, box_height: float, max_size: int, min_size: int) -> int:
+    if _fits(paragraphs, max_size, box_width, box_height):
+        return max_size
+    low, high = min_size, max_size - 1  # Largest fitting size lies in [low, high]; min_size is the floor
+    while low < high:
+        mid = (low + high + 1) // 2
+        if _fits(paragraphs, mid, box_width, box_height):
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def fit_font_size(paragraphs: Sequence[str], box_width: float, box_height: float, max_size: int = 20, min_size: int = 12) -> int:
+    """
+    Returns the largest whole point size in [min_size, max_size] at which the paragraphs,
+    word-wrapped to `box_width`, fit in `box_height` (both in points). Falls back to
+    min_size when nothing fits. Results are memoized for repeated text.
+    """
+    return _fit_font_size(tuple(paragraphs), float(box_width), float(box_height), int(max_size), int(min_size))
@@ -0,0 +1,160 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from PIL import Image, ImageDraw
+
+from text_fit import load_font
+
+THUMBNAIL_WIDTH = int(os.getenv("THUMBNAIL_WIDTH", "480"))  # Pixels; height follows the slide's aspect ratio
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 renders in-process
+THUMBNAIL_JPEG_QUALITY = int(os.getenv("THUMBNAIL_JPEG_QUALITY", "80"))
+RENDERER_VERSION = "1"  # Bump when drawing changes so cached thumbnails are not reused
+
+
+def _file_stamp(path: Optional[str]):
+    if not path:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def thumbnail_key(spec: Dict) -> str:
+    """Content hash of a thumbnail: the drawing spec plus the state of the image files it reads."""
+    stamps = [_file_stamp(spec.get("background_image")), _file_stamp((spec.get("image") or {}).get("path"))]
+    payload = json.dumps([RENDERER_VERSION, THUMBNAIL_JPEG_QUALITY, spec, stamps], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=64)
+def _font(size: int, bold: bool):
+    return load_font(max(1, size), bold)
+
+
+def _wrap(draw: ImageDraw.ImageDraw, text: str, font, width: int) -> List[str]:
+    """Greedy word wrap to `width` pixels, like the text box does."""
+    lines, line = [], ""
+    for word in text.split():
+        candidate = f"{line} {word}" if line else word
+        if line and draw.textlength(candidate, font=font) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    lines.append(line)
+    return lines
+
+
+def _paste_image(canvas: Image.Image, path: Optional[str], box) -> None:
+    if not path:
+        return
+    x, y, width, height = box
+    try:
+        with Image.open(path) as img:
+            img.draft("RGB", (width, height))  # JPEG decodes at a reduced scale directly
+            canvas.paste(img.convert("RGB").resize((width, height), Image.BILINEAR), (x, y))
+    except OSError:
+        pass  # A missing or unreadable image just leaves its area empty
+
+
+def render_thumbnail(spec: Dict) -> bytes:
+    """
+    Draws an approximate slide as a JPEG from a spec built by services.thumbnail_spec:
+    background colour or picture, title, slide image and wrapped bullet text, all
+    already placed in pixels. Runs in worker processes, so it only uses Pillow.
+    """
+    width, height = spec["size"]
+    canvas = Image.new("RGB", (width, height), spec["background"])
+    _paste_image(canvas, spec.get("background_image"), (0, 0, width, height))
+    draw = ImageDraw.Draw(canvas)
+
+    title = spec["title"]
+    x, y, box_width, box_height = title["box"]
+    font = _font(title["font_px"], True)
+    lines = _wrap(draw, title["text"], font, box_width)
+    line_height = round(title["font_px"] * spec["line_spacing"])
+    top = y + max(0, (box_height - line_height * len(lines)) // 2)
+    for line in lines:
+        offset = {"ctr": (box_width - draw.textlength(line, font=font)) // 2, "r": box_width - draw.textlength(line, font=font)}.get(title["align"], 0)
+        draw.text((x + offset, top), line, font=font, fill=title["color"])
+        top += line_height
+
+    if spec.get("image"):
+        _paste_image(canvas, spec["image"]["path"], spec["image"]["box"])
+
+    body = spec["body"]
+    x, y, box_width, box_height = body["box"]
+    font = _font(body["font_px"], False)
+    line_height = round(body["font_px"] * spec["line_spacing"])
+    for paragraph in body["paragraphs"]:
+        for line in _wrap(draw, paragraph, font, box_width):
+            if y + line_height > body["box"][1] + box_height:
+                break
+            draw.text((x, y), line, font=font, fill=body["color"])
+            y += line_height
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, format="JPEG", quality=THUMBNAIL_JPEG_QUALITY)
+    return buffer.getvalue()
+
+
+def _warm_worker() -> None:
+    _font(12, True)
+    _font(12, False)
+
+
+class ThumbnailPool:
+    """
+    Renders thumbnails in parallel on a process pool, started on first use.
+
+    Drawing and JPEG encoding are CPU-bound, so separate processes render a deck's
+    slides side by side instead of taking turns on the GIL. With one worker (or a
+    single slide) rendering happens in the calling thread.
+    """
+
+    def __init__(self, workers: int = THUMBNAIL_WORKERS):
+        self.workers = workers
+        self.rendered = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the server process has threads that fork would copy mid-flight
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def warm(self) -> None:
+        """Starts the worker processes and loads their fonts now, so the first preview does not wait for them."""
+        if self.workers > 1:
+            pool = self._get_pool()
+            for _ in range(self.workers):
+                pool.submit(_warm_worker)
+
+    def render(self, specs: List[Dict]) -> List[bytes]:
+        with self._lock:
+            self.rendered += len(specs)
+        if self.workers <= 1 or len(specs) <= 1:
+            return [render_thumbnail(spec) for spec in specs]
+        try:
+            return list(self._get_pool().map(render_thumbnail, specs))
+        except BrokenProcessPool:
+            self.shutdown()  # A worker died; the next call starts a fresh pool
+            return [render_thumbnail(spec) for spec in specs]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
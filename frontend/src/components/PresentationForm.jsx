@@ -2,6 +2,8 @@ import { useState } from "react";
 import axios from "axios";
 import SlidePreview from "./SlidePreview"; // Import the new component
 
+const API_BASE = "https://smartpresentationgenerator-production.up.railway.app";
+
 const PresentationForm = () => {
   const [title, setTitle] = useState("");
   const [author, setAuthor] = useState("");
@@ -31,21 +33,24 @@ const PresentationForm = () => {
     };
 
     try {
+      // Fetch slide previews first so the deck is built from the same outline
+      const previewResponse = await axios.post(`${API_BASE}/api/preview_slides`, requestData);
+      const outlineId = previewResponse.data.outline_id;
+
       const response = await axios.post(
-        "https://smartpresentationgenerator-production.up.railway.app/api/generate_presentation",
-        requestData,
+        `${API_BASE}/api/generate_presentation`,
+        { ...requestData, outline_id: outlineId },
         { responseType: "blob" }
       );
 
       const blobUrl = window.URL.createObjectURL(new Blob([response.data]));
       setPptBlob(blobUrl);
 
-      // Fetch slide previews (if API supports it)
-      const previewResponse = await axios.post(
-        "https://smartpresentationgenerator-production.up.railway.app/api/preview_slides",
-        requestData
-      );
-      setPreviewImages(previewResponse.data.slide_previews);
+      // Thumbnails only draw images already generated, so ask once the deck build has fetched them; a failure only hides them
+      axios
+        .post(`${API_BASE}/api/preview_slides/thumbnails`, { ...requestData, outline_id: outlineId })
+        .then((thumbs) => setPreviewImages(thumbs.data.thumbnails.map((url) => `${API_BASE}${url}`)))
+        .catch((error) => console.error("Error rendering slide thumbnails:", error));
 
     } catch (error) {
       console.error("Error generating presentation:", error);